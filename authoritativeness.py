@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def alpha(case, CB, method):
     if method == "relative":
         return relative_authoritativeness(case, CB)
@@ -51,3 +54,39 @@ def harmonic_authoritativeness(case, CB, beta):
     rels = relative_authoritativeness(case, CB)
     abss = absolute_authoritativeness(case, CB)
     return (1 + beta**2) * (rels * abss) / ((beta**2 * rels) + abss)
+
+
+def alphas_from_counts(n_a, n_d, n, method):
+    """
+    Compute the authoritativeness of all cases at once from arrays holding
+    their number of agreeing and disagreeing precedents, for a case base of
+    size n, using the same formulas as the functions above.
+    """
+    n_a = np.asarray(n_a)
+    n_d = np.asarray(n_d)
+    rels = n_a / (n_a + n_d)
+    abss = n_a / n
+    if method == "relative":
+        return rels
+    elif method == "absolute":
+        return abss
+    elif method == "product":
+        return rels * abss
+    elif method.startswith("harmonic"):
+        beta = float(method.split("_")[1])
+        return harmonic_alphas(n_a, n_d, n, [beta])[0]
+    else:
+        raise ValueError("Unknown method for authoritativeness.")
+
+
+def harmonic_alphas(n_a, n_d, n, betas):
+    """
+    Compute the harmonic authoritativeness of all cases for every beta in
+    betas at once. Returns a matrix with one row of alphas per beta.
+    """
+    n_a = np.asarray(n_a)
+    n_d = np.asarray(n_d)
+    rels = n_a / (n_a + n_d)
+    abss = n_a / n
+    beta = np.asarray(betas, dtype=float)[:, None]
+    return (1 + beta**2) * (rels * abss) / ((beta**2 * rels) + abss)
@@ -0,0 +1,104 @@
+# A bit-packed square boolean matrix, such as the dominance matrix of a case
+# base. Every row is packed into words of 64 bits (see dominance.pack_bits),
+# so the matrix takes n^2 / 8 bytes instead of n^2, and it can be kept in a
+# memory-mapped .npy file on disk instead of in memory. All operations work
+# on tiles of rows, so that only a tile is unpacked at any time.
+import numpy as np
+
+from dominance import BLOCK_PAIRS, pack_bits, popcount
+
+
+class BitMatrix:
+    def __init__(self, words):
+        self.words = words
+        self.n = len(words)
+
+    @classmethod
+    def zeros(cls, n, path=None):
+        """
+        Create an n x n matrix of zeros, in memory or, if a path is given, in
+        a memory-mapped .npy file.
+        """
+        shape = (n, max(1, (n + 63) // 64))
+        if path is None:
+            return cls(np.zeros(shape, dtype=np.uint64))
+        return cls(
+            np.lib.format.open_memmap(path, mode="w+", dtype=np.uint64, shape=shape)
+        )
+
+    @classmethod
+    def from_blocks(cls, n, blocks, path=None):
+        """
+        Create the matrix from pairs (rows, block), where block[a, b] holds
+        the entry (rows[a], b), such as those yielded by
+        dominance.dominance_blocks. The matrix is filled tile by tile.
+        """
+        M = cls.zeros(n, path)
+        for rows, block in blocks:
+            M.words[rows] = pack_bits(block)
+        M.flush()
+        return M
+
+    @classmethod
+    def open(cls, path, mode="r"):
+        """Open a matrix stored in a .npy file without loading it."""
+        return cls(np.load(path, mmap_mode=mode))
+
+    def flush(self):
+        if isinstance(self.words, np.memmap):
+            self.words.flush()
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        """Return row i as a boolean array."""
+        return self.rows([i])[0]
+
+    def get(self, i, j):
+        return bool((int(self.words[i, j // 64]) >> (j % 64)) & 1)
+
+    def rows(self, rows):
+        """Return the given rows as a boolean matrix."""
+        packed = np.ascontiguousarray(self.words[rows]).view(np.uint8)
+        bits = np.unpackbits(packed, axis=1, count=self.n, bitorder="little")
+        return bits.view(bool)
+
+    def iter_rows(self, block_pairs=BLOCK_PAIRS):
+        """Yield pairs (rows, block) holding the matrix in tiles of rows."""
+        size = max(1, block_pairs // max(self.n, 1))
+        for i in range(0, self.n, size):
+            rows = np.arange(i, min(i + size, self.n))
+            yield rows, self.rows(rows)
+
+    def diagonal(self):
+        i = np.arange(self.n)
+        return ((self.words[i, i // 64] >> (i % 64).astype(np.uint64)) & 1) == 1
+
+    def row_counts(self, mask=None, block_pairs=BLOCK_PAIRS):
+        """
+        Return the number of entries set in every row, counting only the
+        columns for which mask holds if a mask is given.
+        """
+        m = None if mask is None else pack_bits(np.asarray(mask, bool)[None, :])[0]
+        counts = np.zeros(self.n, dtype=np.int64)
+        size = max(1, block_pairs // max(self.n, 1))
+        for i in range(0, self.n, size):
+            words = np.asarray(self.words[i : i + size])
+            counts[i : i + size] = popcount(words if m is None else words & m)
+        return counts
+
+    def col_counts(self, mask=None, block_pairs=BLOCK_PAIRS):
+        """
+        Return the number of entries set in every column, counting only the
+        rows for which mask holds if a mask is given.
+        """
+        counts = np.zeros(self.n, dtype=np.int64)
+        for rows, block in self.iter_rows(block_pairs):
+            if mask is not None:
+                block = block[np.asarray(mask, bool)[rows]]
+            counts += block.sum(axis=0)
+        return counts
+
+    def to_dense(self):
+        return self.rows(np.arange(self.n))
@@ -1,6 +1,12 @@
 # Define <=_s and <_s in terms of the <= and < relations.
 # These are needed for the case class.
+import copy
+import hashlib
+import json
+import numbers
 import operator
+import os
+from collections.abc import Mapping
 
 import numpy as np
 import pandas as pd
@@ -8,25 +14,58 @@ from sklearn import preprocessing
 from sklearn.linear_model import LogisticRegression
 from tabulate import tabulate
 from termcolor import colored
-from tqdm import tqdm
 
-from authoritativeness import (
-    absolute_authoritativeness,
-    harmonic_authoritativeness,
-    product_authoritativeness,
-    relative_authoritativeness,
+from authoritativeness import alphas_from_counts
+from consistency import minimum_removals, weighted_removals
+from dominance import (
+    ALPHA_ORDERS,
+    BLOCK_PAIRS,
+    compare_value,
+    dominance_blocks,
+    dominance_matrix,
+    encode_columns,
+    outcome_counts,
 )
+from bitmatrix import BitMatrix
+from planes import DimensionPlanes
+from relation import Relation
+from unique import UniqueCases
 
 
-def Rplus(x, R):
-    return R[x] | {z for y in R[x] for z in Rplus(y, R)}
+# Takes as input a (finite) Hasse Diagram, where the nodes are given by A and
+# the covering relation by R, and returns the nodes together with the boolean
+# reachability matrix of the reflexive transitive closure of R. The closure is
+# computed by Warshall's algorithm, where every row is a bitset (an integer).
+def reachability(A, R):
+    A = list(A)
+    index = {x: k for k, x in enumerate(A)}
+    rows = [1 << k for k in range(len(A))]
+    for x, y in R:
+        if x in index and y in index:
+            rows[index[x]] |= 1 << index[y]
+    for k in range(len(A)):
+        for i in range(len(A)):
+            if rows[i] >> k & 1:
+                rows[i] |= rows[k]
+    nbytes = (len(A) + 7) // 8
+    reach = np.array(
+        [
+            np.unpackbits(
+                np.frombuffer(r.to_bytes(nbytes, "little"), dtype=np.uint8),
+                bitorder="little",
+            )[: len(A)]
+            for r in rows
+        ],
+        dtype=bool,
+    ).reshape(len(A), len(A))
+    return A, reach
 
 
 # Takes as input a (finite) Hasse Diagram, where the nodes are given by A and
 # the covering relation by R, and return the reflexive transitive closure of R.
 def tr_closure(A, R):
-    R = {x: {y for y in A if (x, y) in R} for x in A}
-    return {(x, x) for x in A} | {(x, y) for x in A for y in Rplus(x, R)}
+    A, reach = reachability(A, R)
+    return {(A[i], A[j]) for i, j in zip(*np.nonzero(reach))}
 
 
 def le(s, v1, v2):
@@ -70,10 +109,72 @@ class Coordinate:
 # This order must be specified at creation by the 'le' function.
 # Its elements are assumed to be partially ordered by <=, specified
 # by the 'le' function, where the default direction is for the plaintiff.
+# An order given as a set of pairs is compiled into a map from values to
+# indices and a boolean matrix, so that a comparison takes two lookups.
 class Dimension:
+    reach = None
+
     def __init__(self, name, le):
         self.name = name
-        self.le = le if type(le) != set else lambda x, y: (x, y) in le
+        if type(le) == set:
+            values = list(dict.fromkeys(x for pair in le for x in pair))
+            reach = np.zeros((len(values), len(values)), dtype=bool)
+            self.compile(values, reach)
+            for x, y in le:
+                reach[self.index[x], self.index[y]] = True
+        else:
+            self.le = le
+
+    # Creates a dimension ordered by the reflexive transitive closure of the
+    # Hasse diagram with nodes A and covering relation R.
+    @classmethod
+    def from_hasse(cls, name, A, R):
+        return cls.from_reach(name, *reachability(A, R))
+
+    # Creates a dimension ordered by the boolean matrix reach, where
+    # reach[i, j] holds iff values[i] <= values[j].
+    @classmethod
+    def from_reach(cls, name, values, reach):
+        dim = cls.__new__(cls)
+        dim.name = name
+        dim.compile(list(values), np.asarray(reach))
+        return dim
+
+    # Returns the order as a set of pairs.
+    def pairs(self):
+        return {
+            (self.values[i], self.values[j]) for i, j in zip(*np.nonzero(self.reach))
+        }
+
+    # Returns the dimension with the reverse order.
+    def reversed(self):
+        if self.reach is not None:
+            return Dimension.from_reach(self.name, self.values, self.reach.T)
+        if self.le is operator.le or self.le is operator.ge:
+            return Dimension(
+                self.name, operator.ge if self.le is operator.le else operator.le
+            )
+        le = self.le
+        return Dimension(self.name, lambda x, y: le(y, x))
+
+    def compile(self, values, reach):
+        self.values = values
+        self.index = {x: k for k, x in enumerate(values)}
+        self.reach = reach
+        self.le = self._reaches
+
+    def _reaches(self, x, y):
+        i = self.index.get(x)
+        j = self.index.get(y)
+        if i is None or j is None:
+            # A value outside the order, such as a value of a case added after
+            # the order was learned, is only comparable with itself.
+            if i is not None or j is not None:
+                return False
+            if pd.isna(x) or pd.isna(y):
+                return bool(pd.isna(x) and pd.isna(y))
+            return bool(x == y)
+        return bool(self.reach[i, j])
 
     def __eq__(self, d):
         return self.name == d.name and self.le == d.le
@@ -82,14 +183,235 @@ class Dimension:
         return f"dim({self.name})"
 
 
+# A fact situation of a case that is stored in a CaseStore. It behaves like
+# the dictionary mapping dimensions to coordinates, but only creates the
+# coordinate objects when they are requested.
+class FactSituation(Mapping):
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, d):
+        return Coordinate(self.store.columns[d][self.row], self.store.D[d])
+
+    def __setitem__(self, d, value):
+        self.store.set_value(self.row, d, value)
+
+    def __iter__(self):
+        return iter(self.store.dims)
+
+    def __len__(self):
+        return len(self.store.dims)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+# Columnar storage for the cases of a case base. Every dimension is stored as
+# one contiguous array of values, which is also encoded in a single rank
+# matrix (see dominance.py), next to arrays holding the names, outcomes and
+# authoritativeness of the cases. The function on_change, if set, is called
+# whenever a stored value is changed, so that its owner can clear what it
+# computed from the old values.
+class CaseStore:
+    def __init__(
+        self, D, columns, names, outcomes, alphas=None, ranks=None, tables=None
+    ):
+        self.D = D
+        self.dims = list(D)
+        self.columns = columns
+        self.names = names
+        self.outcomes = outcomes
+        self.alphas = np.full(len(names), np.nan) if alphas is None else alphas
+        if ranks is None:
+            ranks, tables = encode_columns(D, columns)
+        self.ranks = ranks
+        self.tables = tables
+        self.on_change = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def take(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        return CaseStore(
+            self.D,
+            {d: self.columns[d][rows] for d in self.dims},
+            self.names[rows],
+            self.outcomes[rows],
+            self.alphas[rows],
+            self.ranks[rows],
+            self.tables,
+        )
+
+    def set_value(self, row, d, value):
+        value = value.value if isinstance(value, Coordinate) else value
+        column = self.columns[d]
+        if np.can_cast(np.asarray(value).dtype, column.dtype, "same_kind"):
+            column = self.columns[d] = column.copy()
+        else:
+            column = self.columns[d] = column.astype(object)
+        column[row] = value
+        self.ranks, self.tables = encode_columns(self.D, self.columns)
+        if self.on_change is not None:
+            self.on_change()
+
+    def compare_values(self, values):
+        """
+        Compare a fact situation, given as a mapping from the dimensions to
+        values, with every stored case. Returns boolean matrices fw and bw
+        where fw[j, k] holds iff the value in dimension k is <= that of case j
+        and bw[j, k] iff the value of case j is <= it, and an array holding
+        whether each value is <= itself.
+        """
+        n = len(self)
+        fw = np.ones((n, len(self.dims)), dtype=bool)
+        bw = np.ones((n, len(self.dims)), dtype=bool)
+        refl = np.ones(len(self.dims), dtype=bool)
+        for k, d in enumerate(self.dims):
+            fw[:, k], bw[:, k] = compare_value(self.D[d], self.columns[d], values[d])
+            refl[k] = self.D[d].le(values[d], values[d])
+        return fw, bw, refl
+
+    def append(self, values, name, outcome, fw, bw, refl):
+        """
+        Append a case, given the result of compare_values for its values.
+        The rank matrix is updated in place: a new value in a totally ordered
+        dimension is given a rank in between those of its neighbours, and a
+        new value in any other dimension extends the relation table.
+        """
+        self.tables = list(self.tables)
+        rank = np.zeros(len(self.dims), dtype=np.int64)
+        for k, d in enumerate(self.dims):
+            v = values[d]
+            f, b = fw[:, k], bw[:, k]
+            if self.tables[k] is None and not ((f | b).all() and refl[k]):
+                self._tabulate(k)
+            if self.tables[k] is None:
+                equal = np.flatnonzero(f & b)
+                if len(equal):
+                    rank[k] = self.ranks[equal[0], k]
+                else:
+                    below = self.ranks[b, k]
+                    rank[k] = below.max() + 1 if len(below) else 0
+                    self.ranks[~b, k] += 1
+            else:
+                equal = np.flatnonzero(pd.Series(self.columns[d]).eq(v))
+                if len(equal):
+                    rank[k] = self.ranks[equal[0], k]
+                else:
+                    table = self.tables[k]
+                    u = len(table)
+                    grown = np.zeros((u + 1, u + 1), dtype=bool)
+                    grown[:u, :u] = table
+                    grown[u, self.ranks[:, k]] = f
+                    grown[self.ranks[:, k], u] = b
+                    grown[u, u] = refl[k]
+                    self.tables[k] = grown
+                    rank[k] = u
+            self.columns[d] = np.append(self.columns[d], [v])
+        self.ranks = np.vstack([self.ranks, rank])
+        self.names = np.append(self.names, np.array([name], dtype=object))
+        self.outcomes = np.append(self.outcomes, outcome)
+        self.alphas = np.append(self.alphas, np.nan)
+
+    def _tabulate(self, k):
+        # Turn the ranks of dimension k into codes with a relation table.
+        uniq, codes = np.unique(self.ranks[:, k], return_inverse=True)
+        self.ranks[:, k] = codes.reshape(-1)
+        self.tables[k] = uniq[:, None] <= uniq[None, :]
+
+    def swap_remove(self, row):
+        """Remove a case by moving the last case into its row."""
+        last = len(self) - 1
+        for d in self.dims:
+            self.columns[d] = _swap_remove(self.columns[d], row, last)
+        for name in ["ranks", "names", "outcomes", "alphas"]:
+            setattr(self, name, _swap_remove(getattr(self, name), row, last))
+
+    # Evaluate le(s, v1, v2) for the values v1 of case i and v2 of case j in
+    # every dimension at once.
+    def le_mask(self, i, j, s):
+        a, b = self.ranks[i], self.ranks[j]
+        mask = (a <= b) if s == 1 else (a >= b)
+        for k, table in enumerate(self.tables):
+            if table is not None:
+                mask[k] = table[a[k], b[k]] if s == 1 else table[b[k], a[k]]
+        return mask
+
+
+def _swap_remove(array, row, last):
+    # Copy the array without its last row, which replaces the given row.
+    result = array[:last].copy()
+    if row < last:
+        result[row] = array[last]
+    return result
+
+
+def artifact_key(csv, **params):
+    """
+    Return a hash of the contents of a csv file and the parameters a case
+    base is created with, which identifies an artifact saved by CaseBase.save.
+    """
+    h = hashlib.sha256()
+    with open(csv, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    if "manords" in params:
+        params["manords"] = {
+            d: sorted(map(repr, o)) if type(o) == set else repr(o)
+            for d, o in params["manords"].items()
+        }
+    h.update(json.dumps(params, sort_keys=True, default=repr).encode())
+    return h.hexdigest()
+
+
+def _jsonable(values):
+    # Convert an array of values to a list that can be written as JSON.
+    return [x.item() if isinstance(x, np.generic) else x for x in values]
+
+
 # A class for cases, i.e. fact situations together with an outcome.
 # A fact situation is represented as a dictionary mapping the dimensions to
-# a coordonate in that dimension.
+# a coordonate in that dimension. Cases in a case base are views onto a row
+# of its CaseStore instead, see Case.view.
 class Case:
+    __slots__ = ("_name", "_F", "_s", "_alpha", "_store", "_row")
+
     def __init__(self, name, F, s):
-        self.name = name
-        self.F = F
-        self.s = s
+        self._name = name
+        self._F = F
+        self._s = s
+        self._store = None
+
+    @classmethod
+    def view(cls, store, row):
+        case = cls.__new__(cls)
+        case._store = store
+        case._row = row
+        return case
+
+    @property
+    def name(self):
+        return self._name if self._store is None else self._store.names[self._row]
+
+    @property
+    def s(self):
+        return self._s if self._store is None else self._store.outcomes[self._row]
+
+    @property
+    def F(self):
+        if self._store is None:
+            return self._F
+        return FactSituation(self._store, self._row)
+
+    @property
+    def alpha(self):
+        if self._store is None:
+            return self._alpha
+        return self._store.alphas[self._row]
 
     def __le__(self, d):
         return not any(self.diff(d.F))
@@ -115,18 +437,54 @@ class Case:
             sep + "\n" + table + "\n" + sep + "\n" + f"Outcome: {self.s}" + "\n" + sep
         )
 
+    # Returns the row of G if both G and this case are stored in the same
+    # CaseStore, in which case the rank matrix can be used to compare them.
+    def _shared_row(self, G):
+        G = G.F if isinstance(G, Case) else G
+        if isinstance(G, FactSituation) and G.store is self._store:
+            return G.row
+        return None
+
     def diff(self, G):
+        row = self._shared_row(G)
+        if row is not None:
+            mask = self._store.le_mask(self._row, row, self.s)
+            yield from (self._store.dims[k] for k in np.flatnonzero(~mask))
+            return
         for d in self.F:
             if not le(self.s, self[d], G[d]):
                 yield d
 
     def comp_diff(self, G):
+        row = self._shared_row(G)
+        if row is not None:
+            mask = self._store.le_mask(self._row, row, self.s)
+            yield from (self._store.dims[k] for k in np.flatnonzero(mask))
+            return
         for d in self.F:
             if le(self.s, self[d], G[d]):
                 yield d
 
     def set_alpha(self, authoritativeness):
-        self.alpha = authoritativeness
+        if self._store is None:
+            self._alpha = authoritativeness
+        else:
+            self._store.alphas[self._row] = authoritativeness
+
+
+# Whether the values of a column can be ordered as numbers: booleans, integers
+# and finite floats, also when they are held in a column of objects.
+def is_ordinal(column):
+    if pd.api.types.is_bool_dtype(column) or pd.api.types.is_integer_dtype(column):
+        return True
+    if pd.api.types.is_object_dtype(column):
+        kinds = {"boolean", "integer", "floating", "mixed-integer-float", "decimal"}
+        if pd.api.types.infer_dtype(column, skipna=False) not in kinds:
+            return False
+        column = pd.to_numeric(column).astype(float)
+    if pd.api.types.is_float_dtype(column):
+        return bool(np.isfinite(column.to_numpy()).all())
+    return False
 
 
 # A class for a case base, in essence it is just a list of cases
@@ -141,6 +499,8 @@ class CaseBase(list):
         verb=False,
         method="pearson",
         auth_method="default",
+        order_cache=None,
+        dedup=False,
     ):
         """
         Inputs.
@@ -150,8 +510,8 @@ class CaseBase(list):
                 A list of the categorical columns in the data. This will
                 also determine a variable 'ordcs' of ordinal columns. If
                 no value is provided it will automatically be defined
-                as those columns of which not all values can be converted to
-                integers.
+                as those columns of which not all values are finite numbers
+                (see is_ordinal).
             replace:
                 A boolean indicating whether the values in the dataframe
                 should be replaced based on their order. For example,
@@ -171,126 +531,577 @@ class CaseBase(list):
                 A string indicating the desired method of determining the dimension orders,
                 possible values are 'logreg' for logistic regression and 'pearson' for the
                 Pearson correlation method.
+            order_cache:
+                An OrderCache (see orders.py) from which the orders are taken
+                if they were learned before with the same data and parameters.
+            dedup:
+                A boolean indicating whether cases with identical values should
+                be collapsed into unique fact situations (see unique.py) for
+                computing counts, alphas, inconsistencies and precedents.
 
         Attributes.
             df: The dataframe holding the csv.
             D: A dictionary mapping names of dimensions to a dimension class object.
+            replaced: A dictionary mapping the replaced categorical columns to
+                their values in order, if 'replace' is set.
+            coeffs: A dictionary holding the coefficients the orders are learned from.
+            store: The CaseStore holding the values, ranks, outcomes and
+                authoritativeness of the cases column by column.
         """
 
-        self.df = df
         self.auth_method = auth_method
+        self.catcs = catcs
+        self.replace = replace
+        self.manords = manords
+        self.method = method
+        self.order_cache = order_cache
+        self.dedup = dedup
+        self.df = df = self.learn_orders(df, verb)
+
+        # Store the cases column by column, the cases themselves are views.
+        store = CaseStore(
+            self.D,
+            {d: df[d].to_numpy() for d in self.D},
+            df.index.to_numpy(dtype=object),
+            df["Label"].to_numpy(),
+        )
+
+        # Call the list init function to load the cases into the CB.
+        self._set_store(store)
+        self.calculate_alphas()
+
+    def learn_orders(self, df, verb=False):
+        """
+        Determine the dimensions D and their orders from the dataframe df,
+        using the parameters the case base was created with. If 'replace' is
+        set, the categorical values are replaced by their position in the
+        learned order, which is kept in the attribute 'replaced'. The orders
+        are taken from the order cache if it holds them, see orders.py.
+        Returns the dataframe with the replaced values, df itself is left as
+        it is.
+        """
+        replace = self.replace
+        manords = self.manords
+        cache = self.order_cache
+        orders = None
+        if cache is not None:
+            key = cache.key(df, self.method, self.catcs, manords, replace)
+            orders = cache.get(key)
+        if orders is None:
+            orders = self.fit_orders(df)
+            if cache is not None:
+                cache.put(key, orders)
+        catcs, ordcs, coeffs = orders["catcs"], orders["ordcs"], orders["coeffs"]
+
+        # Initialize the dimensions using the manually specified ones.
+        self.D = {d: Dimension(d, manords[d]) for d in manords}
+        self.replaced = {}
+        self.coeffs = coeffs
+
+        # Determine orders of ordinal features using the coeffs dict.
+        self.D.update(
+            {
+                c: (
+                    Dimension(c, operator.le)
+                    if coeffs[c] > 0
+                    else Dimension(c, operator.ge)
+                )
+                for c in ordcs
+            }
+        )
+
+        # Log the orders of the ordinal features.
+        if verb:
+            print("Dimension orders.")
+            for c in ordcs:
+                print(
+                    f"{colored(c, 'red')}: {colored('Ascending' if coeffs[c] > 0 else 'Descending', 'green')} ({round(coeffs[c], 2)})"
+                )
+
+        # Determine orders of categorical features using the sorted values.
+        for c in catcs:
+            scvals = orders["scvals"][c]
+
+            # Log the orders of this feature.
+            if verb:
+                print(
+                    f"{colored(c, 'red')}: "
+                    + " < ".join(
+                        [
+                            f"{colored(v, 'green')} ({round(coeffs[f'{c}_{v}'], 4)})"
+                            for v in scvals
+                        ]
+                    )
+                )
+
+            # Replace the values of the categorical feature with numbers, so that
+            # we can simply compare using <= on the naturals, if enabled. This is
+            # done on a (shallow) copy, so that the given dataframe is unchanged.
+            if replace:
+                if not self.replaced:
+                    df = df.copy(deep=False)
+                df[c] = df[c].map({val: i for i, val in enumerate(scvals)})
+                self.D[c] = Dimension(c, operator.le)
+                self.replaced[c] = scvals
+
+            # Otherwise, make the relation on the original categorical values.
+            else:
+                hd = {(scvals[i], scvals[i + 1]) for i in range(len(scvals) - 1)}
+                self.D[c] = Dimension.from_hasse(c, df[c].unique(), hd)
+        return df
+
+    def fit_orders(self, df):
+        """
+        Learn the orders of the dimensions from the dataframe df. Returns a
+        dictionary holding the categorical and ordinal columns (without the
+        manually ordered ones), the coefficients of the (dummy) columns and,
+        for every categorical column, its values sorted by their coefficient.
+        """
+        catcs = self.catcs
+        manords = self.manords
+        method = self.method
         cs = [c for c in df.columns.values if c != "Label"]
 
         # Identify the categorical and ordinal columns (if this hasn't been done yet)
-        # by trying to convert the values of the column to integers.
+        # by the types of their values.
         if catcs == None:
-            catcs = []
-            ordcs = []
-            for c in cs:
-                try:
-                    df[c].apply(int)
-                    ordcs += [c]
-                except ValueError:
-                    catcs += [c]
+            ordcs = [c for c in cs if is_ordinal(df[c])]
+            catcs = [c for c in cs if c not in ordcs]
         else:
             ordcs = [c for c in cs if c not in catcs]
 
-        # Initialize the dimensions using the manually specified ones.
-        self.D = {d: Dimension(d, manords[d]) for d in manords}
-
         # Remove the columns that are manually specified.
         catcs = [c for c in catcs if c not in manords]
         ordcs = [c for c in ordcs if c not in manords]
 
-        # Determine the order based on a method that works with a 'coefficient function'.
-        if method == "pearson" or "logreg":
-
-            # Compute the coefficient dictionary based on either the pearson or logreg method.
-            if method == "pearson":
-                coeffs = pd.get_dummies(df.drop(manords, axis=1)).corr()["Label"]
-            elif method == "logreg":
-                X = pd.get_dummies(
-                    df.drop(manords, axis=1).drop("Label", axis=1)
-                ).to_numpy()
-                dcs = pd.get_dummies(df[cs]).columns.values
-                y = df["Label"].to_numpy()
-                scaler = preprocessing.StandardScaler().fit(X)
-                X = scaler.transform(X)
-                clf = LogisticRegression(random_state=0).fit(X, y)
-                coeffs = dict(zip(dcs, clf.coef_[0]))
-
-            # Determine orders of ordinal features using the coeffs dict.
-            self.D.update(
-                {
-                    c: (
-                        Dimension(c, operator.le)
-                        if coeffs[c] > 0
-                        else Dimension(c, operator.ge)
-                    )
-                    for c in ordcs
-                }
-            )
+        # Compute the coefficient dictionary based on either the pearson or logreg method.
+        if method == "pearson":
+            coeffs = pd.get_dummies(df.drop(manords, axis=1)).corr()["Label"]
+        elif method == "logreg":
+            X = pd.get_dummies(
+                df.drop(manords, axis=1).drop("Label", axis=1)
+            ).to_numpy()
+            dcs = pd.get_dummies(df[cs]).columns.values
+            y = df["Label"].to_numpy()
+            scaler = preprocessing.StandardScaler().fit(X)
+            X = scaler.transform(X)
+            clf = LogisticRegression(random_state=0).fit(X, y)
+            coeffs = dict(zip(dcs, clf.coef_[0]))
+        coeffs = {c: float(coeffs[c]) for c in dict(coeffs)}
 
-            # Log the orders of the ordinal features.
-            if verb:
-                print("Dimension orders.")
-                for c in ordcs:
-                    print(
-                        f"{colored(c, 'red')}: {colored('Ascending' if coeffs[c] > 0 else 'Descending', 'green')} ({round(coeffs[c], 2)})"
-                    )
+        scvals = {
+            c: sorted(df[c].unique(), key=lambda x: coeffs[f"{c}_{x}"]) for c in catcs
+        }
+        return {"catcs": catcs, "ordcs": ordcs, "coeffs": coeffs, "scvals": scvals}
 
-            # Determine orders of categorical features using the coeffs dict.
-            for c in catcs:
-                cvals = df[c].unique()
-                scvals = sorted(cvals, key=lambda x: coeffs[f"{c}_{x}"])
-
-                # Log the orders of this feature.
-                if verb:
-                    print(
-                        f"{colored(c, 'red')}: "
-                        + " < ".join(
-                            [
-                                f"{colored(v, 'green')} ({round(coeffs[f'{c}_{v}'], 4)})"
-                                for v in scvals
-                            ]
-                        )
-                    )
+    def _set_store(self, store):
+        self.store = store
+        store.on_change = self._clear_caches
+        self._clear_caches()
+        super(CaseBase, self).__init__(Case.view(store, i) for i in range(len(store)))
 
-                # Replace the values of the categorical feature with numbers, so that
-                # we can simply compare using <= on the naturals, if enabled.
-                if replace:
-                    for i, val in enumerate(scvals):
-                        df[c] = df[c].replace(val, i)
-                    self.D[c] = Dimension(c, operator.le)
+    def _clear_caches(self):
+        # Forget everything computed from the values of the cases.
+        self._dominance = None
+        self._buffer = None
+        self._bits = None
+        self._planes = None
+        self._counts = None
+        self._unique = None
 
-                # Otherwise, make the relation on the original categorical values.
-                else:
-                    hd = {(scvals[i], scvals[i + 1]) for i in range(len(scvals) - 1)}
-                    trhd = tr_closure(df[c].unique(), hd)
-                    self.D[c] = Dimension(c, trhd)
+    def with_auth_method(self, auth_method, alphas=None):
+        """
+        Return a copy of the case base using another auth_method. The copy
+        shares the orders, the agreement counts and the dominance matrix (if
+        computed), so that only the alphas are computed, unless they are
+        given as 'alphas'.
+        """
+        counts = self.get_agreement_counts()
+        CB = CaseBase.__new__(CaseBase)
+        CB.__dict__.update(self.__dict__)
+        CB.auth_method = auth_method
+        store = copy.copy(self.store)
+        store.columns = dict(store.columns)
+        store.ranks = store.ranks.copy()
+        store.alphas = np.full(len(self), np.nan)
+        CB._set_store(store)
+        CB._dominance, CB._counts = self._dominance, counts
+        CB._unique, CB._bits = self._unique, self._bits
 
-        # Read the rows into a list of cases.
-        cases = [
-            Case(i, {d: Coordinate(r[d], self.D[d]) for d in self.D}, r["Label"])
-            for i, r in df.iterrows()
-        ]
+        # The dominance matrix is shared, so both case bases copy its buffer
+        # before they change it.
+        CB._buffer = self._buffer = None
+        if alphas is None:
+            CB.calculate_alphas()
+        else:
+            store.alphas[:] = alphas
+        return CB
 
-        # Call the list init function to load the cases into the CB.
-        super(CaseBase, self).__init__(cases)
-        self.calculate_alphas()
+    def get_planes(self, path=None):
+        """
+        Return the comparison bit-planes of the dimensions (see planes.py),
+        kept in memory or, if a path is given, as memory-mapped files in that
+        directory. They are computed once and reused until the cases change.
+        """
+        if self._planes is None:
+            self._planes = DimensionPlanes.from_store(self.store, path)
+        return self._planes
+
+    def with_orders(self, flips=(), drop=(), auth_method=None, path=None):
+        """
+        Return a copy of the case base in which the orders of the dimensions
+        in flips are reversed and the dimensions in drop are left out. Its
+        dominance matrix is combined from the bit-planes of this case base
+        (see get_planes), in a memory-mapped file if a path is given, so that
+        its counts, alphas and forcings are computed without comparing the
+        cases again.
+        """
+        planes = self.get_planes()
+        CB = CaseBase.__new__(CaseBase)
+        CB.__dict__.update(self.__dict__)
+        CB.auth_method = self.auth_method if auth_method is None else auth_method
+        CB.D = {
+            d: self.D[d].reversed() if d in flips else self.D[d]
+            for d in self.D
+            if d not in drop
+        }
+        store = self.store
+        CB._set_store(
+            CaseStore(
+                CB.D,
+                {d: store.columns[d] for d in CB.D},
+                store.names,
+                store.outcomes,
+            )
+        )
+        CB._buffer = None
+        CB._bits = planes.dominance(store.outcomes, flips, drop, path)
+        CB.calculate_alphas()
+        return CB
 
     def calculate_alphas(self):
         if self.auth_method != "default":
-            for c in self:
-                if self.auth_method == "relative":
-                    c.set_alpha(relative_authoritativeness(c, self))
-                if self.auth_method == "absolute":
-                    c.set_alpha(absolute_authoritativeness(c, self))
-                if self.auth_method == "product":
-                    c.set_alpha(product_authoritativeness(c, self))
-                if self.auth_method.startswith("harmonic"):
-                    beta = float(self.auth_method.split("_")[1])
-                    c.set_alpha(harmonic_authoritativeness(c, self, beta))
+            n_a, n_d = self.get_agreement_counts()
+            self.store.alphas[:] = alphas_from_counts(
+                n_a, n_d, len(self), self.auth_method
+            )
+
+    def get_agreement_counts(self):
+        """
+        Return arrays holding for every case its number of agreeing and
+        disagreeing precedents, i.e. n_agreement and n_disagreement for all
+        cases at once. The counts are computed once until the cases change.
+        """
+        if self._counts is None:
+            store = self.store
+            if self._dominance is None and self.dedup:
+                self._counts = self.get_unique().agreement_counts()
+            elif self._dominance is not None:
+                same = store.outcomes[:, None] == store.outcomes[None, :]
+                self._counts = (
+                    (self._dominance & same).sum(axis=1),
+                    (self._dominance & ~same).sum(axis=1),
+                )
+            elif self._bits is not None:
+                up = store.outcomes == 1
+                n_up, n = self._bits.row_counts(up), self._bits.row_counts()
+                self._counts = (
+                    np.where(up, n_up, n - n_up),
+                    np.where(up, n - n_up, n_up),
+                )
+            else:
+                self._counts = outcome_counts(store.ranks, store.tables, store.outcomes)
+        return self._counts
+
+    def get_unique(self):
+        """
+        Return the unique fact situations of the cases together with their
+        multiplicities, see unique.UniqueCases. They are determined once until
+        the cases change.
+        """
+        if self._unique is None:
+            self._unique = UniqueCases(self.store)
+        return self._unique
+
+    def add_case(self, values, outcome, name=None):
+        """
+        Add a case with the given values (a mapping from the names of the
+        dimensions to values) and outcome, and return its index. The case is
+        only compared with the n existing cases, after which the dominance
+        matrix (if computed), the agreement counts and the alphas are updated
+        in O(n). The orders of the dimensions remain as they were learned,
+        see relearn_orders. The values of the categorical columns replaced
+        by their position (see 'replace') are given as the original values,
+        which must be among those the order was learned from. The default
+        name is one more than the highest integer name.
+        """
+        store = self.store
+        n = len(self)
+        if name is None:
+            integers = (c for c in store.names if isinstance(c, numbers.Integral))
+            name = max(integers, default=-1) + 1
+        values = dict(values)
+        for d, scvals in self.replaced.items():
+            positions = {v: i for i, v in enumerate(scvals)}
+            if values[d] not in positions:
+                raise ValueError(
+                    f"Value {values[d]!r} of {d} is not in its learned order, "
+                    "see relearn_orders."
+                )
+            values[d] = positions[values[d]]
+        fw, bw, refl = store.compare_values(values)
+        row, col = self._new_case_relations(fw, bw, refl, outcome)
+        store.append(values, name, outcome, fw, bw, refl)
+        self._unique = self._bits = self._planes = None
+        super(CaseBase, self).append(Case.view(store, n))
+
+        # Add the row and column of the new case to the dominance matrix,
+        # doubling the size of the underlying buffer when it is full.
+        if self._dominance is not None:
+            if self._buffer is None or len(self._buffer) <= n:
+                buffer = np.zeros((2 * n + 1, 2 * n + 1), dtype=bool)
+                buffer[:n, :n] = self._dominance
+                self._buffer = buffer
+            self._buffer[n, : n + 1] = row
+            self._buffer[:n, n] = col[:n]
+            self._dominance = self._buffer[: n + 1, : n + 1]
+
+        # Update the agreement counts of the new case and the cases below it.
+        if self._counts is not None:
+            same = store.outcomes == outcome
+            n_a, n_d = self._counts
+            n_a = np.append(n_a, (row & same).sum()) + (col & same)
+            n_d = np.append(n_d, (row & ~same).sum()) + (col & ~same)
+            n_a[n] -= col[n]
+            self._counts = (n_a, n_d)
+        self.calculate_alphas()
+        return n
+
+    def remove_case(self, k):
+        """
+        Remove the case at index k and return it as a standalone case. The
+        last case takes the place of the removed case, so that the dominance
+        matrix, the agreement counts and the alphas are updated in O(n).
+        """
+        store = self.store
+        case = self[k]
+        last = len(self) - 1
+
+        # Update the agreement counts of the cases below the removed case.
+        if self._counts is not None:
+            if self._dominance is not None:
+                col = self._dominance[:, k]
+            else:
+                values = {d: store.columns[d][k] for d in store.dims}
+                col = self._new_case_relations(
+                    *store.compare_values(values), store.outcomes[k]
+                )[1][:-1]
+            same = store.outcomes == store.outcomes[k]
+            n_a, n_d = (c - (col & m) for c, m in zip(self._counts, [same, ~same]))
+            self._counts = (_swap_remove(n_a, k, last), _swap_remove(n_d, k, last))
+
+        if self._dominance is not None:
+            if self._buffer is None:
+                self._buffer = self._dominance.copy()
+            self._buffer[k, : last + 1] = self._buffer[last, : last + 1]
+            self._buffer[: last + 1, k] = self._buffer[: last + 1, last]
+            self._dominance = self._buffer[:last, :last]
+
+        # Detach the removed case from the store and move the last case.
+        standalone = Case(case.name, dict(case.F), case.s)
+        standalone._alpha = case.alpha
+        case._name, case._F, case._s, case._alpha = (
+            standalone.name,
+            standalone.F,
+            standalone.s,
+            standalone.alpha,
+        )
+        case._store = None
+        store.swap_remove(k)
+        self._unique = self._bits = self._planes = None
+        moved = super(CaseBase, self).pop()
+        if k < last:
+            moved._row = k
+            super(CaseBase, self).__setitem__(k, moved)
+        self.calculate_alphas()
+        return case
+
+    def _new_case_relations(self, fw, bw, refl, outcome):
+        # Given the result of CaseStore.compare_values for a new case, return
+        # whether the new case is <= each case (and itself), and whether each
+        # case is <= the new case (and the new case itself).
+        s = self.store.outcomes
+        if outcome == 1:
+            row = np.append(fw.all(axis=1), refl.all())
+        else:
+            row = np.append(bw.all(axis=1), refl.all())
+        col = np.append(np.where(s == 1, bw.all(axis=1), fw.all(axis=1)), row[-1])
+        return row, col
+
+    def relearn_orders(self, verb=False):
+        """
+        Learn the orders of the dimensions again from the current cases, and
+        recompute everything that depends on them.
+        """
+        df = self.learn_orders(self.to_frame(), verb)
+        store = CaseStore(
+            self.D,
+            {d: df[d].to_numpy() for d in self.D},
+            self.store.names,
+            self.store.outcomes,
+        )
+        self._set_store(store)
+        self.calculate_alphas()
+
+    def to_frame(self):
+        """Return the cases as a dataframe, with their original values."""
+        store = self.store
+        columns = {}
+        for d in store.dims:
+            columns[d] = store.columns[d]
+            if d in self.replaced:
+                scvals = np.asarray(self.replaced[d], dtype=object)
+                columns[d] = scvals[columns[d].astype(np.int64)]
+        df = pd.DataFrame(columns, index=pd.Index(store.names))
+        df["Label"] = store.outcomes
+        return df
+
+    @classmethod
+    def from_csv(cls, csv, artifact=None, verb=False, order_cache=None, **params):
+        """
+        Create a case base from a csv file. If the path of an artifact is
+        given, the case base is loaded from it when it is up to date with the
+        csv file and the parameters, and otherwise built and saved there.
+        """
+        key = artifact_key(csv, **params)
+        if artifact is not None:
+            try:
+                return cls.load(artifact, key)
+            except (FileNotFoundError, ValueError):
+                pass
+        CB = cls(pd.read_csv(csv), verb=verb, order_cache=order_cache, **params)
+        if artifact is not None:
+            CB.save(artifact, key)
+        return CB
+
+    def save(self, path, key=None):
+        """
+        Save the compiled case base to the directory 'path': the learned
+        orders and coefficients in a manifest, and the columns, rank matrix,
+        relation tables, outcomes and alphas as .npy files, which load()
+        maps into memory. The key (see artifact_key) is stored so that load()
+        can tell whether the artifact is still up to date.
+        """
+        store = self.store
+        os.makedirs(path, exist_ok=True)
+        arrays = {
+            "ranks": store.ranks,
+            "outcomes": store.outcomes,
+            "alphas": store.alphas,
+        }
+        dims, columns = [], {}
+        for k, d in enumerate(store.dims):
+            dim = store.D[d]
+            if dim.le is operator.le or dim.le is operator.ge:
+                dims.append({"name": d, "le": dim.le.__name__})
+            elif dim.reach is not None:
+                dims.append({"name": d, "le": "order", "values": _jsonable(dim.values)})
+                arrays[f"reach_{k}"] = dim.reach
+            else:
+                raise ValueError(f"The order of dimension {d} cannot be saved.")
+            if store.tables[k] is not None:
+                arrays[f"table_{k}"] = store.tables[k]
+
+            # Values that are not numbers are stored by their index.
+            column = store.columns[d]
+            if column.dtype.kind in "biuf":
+                arrays[f"column_{k}"] = column
+                columns[d] = None
+            else:
+                codes, uniques = pd.factorize(column, use_na_sentinel=False)
+                arrays[f"column_{k}"] = codes
+                columns[d] = _jsonable(uniques)
+        names = store.names
+        if all(isinstance(x, (int, np.integer)) for x in names):
+            arrays["names"] = names.astype(np.int64)
+            names = None
+
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(array))
+        manifest = {
+            "key": key,
+            "auth_method": self.auth_method,
+            "catcs": self.catcs,
+            "replace": self.replace,
+            "method": self.method,
+            "dims": dims,
+            "manords": list(self.manords),
+            "coeffs": self.coeffs,
+            "replaced": {d: _jsonable(v) for d, v in self.replaced.items()},
+            "columns": columns,
+            "names": None if names is None else _jsonable(names),
+            "tables": [t is not None for t in store.tables],
+            "dedup": self.dedup,
+        }
+        with open(os.path.join(path, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """
+        Load a case base saved by save() without learning the orders again.
+        The arrays are memory-mapped (copy-on-write), so loading is immediate.
+        If a key is given, a ValueError is raised when it differs from the
+        key the artifact was saved with. The attribute 'df' is not restored,
+        see to_frame.
+        """
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        if key is not None and manifest["key"] != key:
+            raise ValueError(f"The artifact at {path} is out of date.")
+
+        def array(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="c")
+
+        CB = cls.__new__(cls)
+        CB.df = None
+        CB.order_cache = None
+        CB.dedup = manifest.get("dedup", False)
+        for attr in ["auth_method", "catcs", "replace", "method", "coeffs"]:
+            setattr(CB, attr, manifest[attr])
+        CB.replaced = manifest["replaced"]
+        CB.D, CB.manords, columns, tables = {}, {}, {}, []
+        for k, spec in enumerate(manifest["dims"]):
+            d = spec["name"]
+            if spec["le"] == "order":
+                dim = Dimension.from_reach(d, spec["values"], array(f"reach_{k}"))
+            else:
+                dim = Dimension(d, getattr(operator, spec["le"]))
+            CB.D[d] = dim
+            if d in manifest["manords"]:
+                CB.manords[d] = dim.le if dim.reach is None else dim.pairs()
+            uniques = manifest["columns"][d]
+            if uniques is None:
+                columns[d] = array(f"column_{k}")
+            else:
+                columns[d] = np.asarray(uniques, dtype=object)[array(f"column_{k}")]
+            tables.append(array(f"table_{k}") if manifest["tables"][k] else None)
+        if manifest["names"] is None:
+            names = array("names").astype(object)
+        else:
+            names = np.asarray(manifest["names"], dtype=object)
+
+        store = CaseStore(
+            CB.D,
+            columns,
+            names,
+            array("outcomes"),
+            array("alphas"),
+            array("ranks"),
+            tables,
+        )
+        CB._set_store(store)
+        return CB
 
     # A function which pretty prints a comparison between cases a and b.
     def compare(self, a, b):
@@ -326,54 +1137,274 @@ class CaseBase(list):
             )
         )
 
-    def take_consistent_subset(self):
-        inds = range(len(self))
-        forcings = self.get_forcings(inds)
-        Id = self.determine_inconsistent_forcings(inds, forcings)
-        inconsistent_indices = self.determine_removals(inds, Id)
-        consistent_subset = self.remove_inconsistencies(inconsistent_indices)
-        super(CaseBase, self).__init__(consistent_subset)
+    def take_consistent_subset(self, method="greedy", n_jobs=1):
+        """
+        Remove cases until no inconsistent forcings remain, see
+        determine_removals for the possible methods and n_jobs. Returns a dictionary
+        holding the removed case names, their number N_del and the objective,
+        i.e. the total alpha removed (or N_del for the default auth method).
+        """
+        if self.dedup:
+            inconsistent_indices = self.unique_removals(method, n_jobs=n_jobs)
+        else:
+            inds = range(len(self))
+            Id = self.get_inconsistent_forcings(inds)
+            inconsistent_indices = self.determine_removals(inds, Id, method, n_jobs)
+        # The removals are positions, so the cases are kept by position too.
+        removed = np.unique(np.asarray(inconsistent_indices, dtype=np.int64))
+        rows = np.setdiff1d(np.arange(len(self)), removed)
+        report = {
+            "removed": self.store.names[removed].tolist(),
+            "N_del": len(removed),
+            "objective": float(self._removal_weights()[removed].sum()),
+        }
+        dominance = self._dominance
+        self._set_store(self.store.take(rows))
 
-    def determine_removals(self, inds, Id):
+        # The dominance matrix of the subset is a submatrix of the current one.
+        if dominance is not None:
+            self._dominance = self._buffer = dominance[np.ix_(rows, rows)]
+        return report
+
+    def _removal_weights(self):
+        if self.auth_method == "default":
+            return np.ones(len(self))
+        return self.get_alphas()
+
+    def determine_removals(self, inds, Id, method="greedy", n_jobs=1):
+        """
+        Determine the cases to remove so that no inconsistent forcings remain.
+        The 'greedy' method repeatedly removes the case with the most
+        inconsistent forcings, the 'exact' method returns a minimum number of
+        removals (see consistency.minimum_removals) and the 'weighted' method
+        removes cases of minimum total alpha (see consistency.weighted_removals).
+        Id is the relation returned by determine_inconsistent_forcings, or a
+        dictionary mapping cases to the sets of cases they conflict with. The
+        components of the conflict graph are processed by n_jobs parallel jobs
+        for the 'exact' and 'weighted' methods.
+        """
+        if isinstance(Id, dict):
+            Id = Relation.from_sets(Id, len(self))
+        if method == "exact":
+            return minimum_removals(Id, self.get_outcomes(), n_jobs)
+        elif method == "weighted":
+            if self.auth_method == "default":
+                raise ValueError("Weighted removals require an auth_method.")
+            removed, _ = weighted_removals(
+                Id, self.get_outcomes(), self.get_alphas(), n_jobs
+            )
+            return removed
+        elif method != "greedy":
+            raise ValueError("Unknown method for determining removals.")
+
+        # Removing a case removes its conflicts with the remaining cases.
+        inds = np.asarray(inds, dtype=np.int64)
+        degrees = Id.degrees().copy()
+        removed = np.zeros(len(degrees), dtype=bool)
         to_remove = []
-        while sum(s := [len(Id[i]) for i in inds]) != 0:
-            k = np.argmax(s)
-            for i in inds:
-                Id[i] -= {k}
-            Id[k] = set()
+        while degrees[inds].sum() != 0:
+            k = int(inds[np.argmax(degrees[inds])])
+            others = Id[k][~removed[Id[k]]]
+            degrees[others] -= 1
+            degrees[k] = 0
+            removed[k] = True
             to_remove.append(k)
         return to_remove
 
-    def remove_inconsistencies(self, indices):
-        consistent_subset = [case for case in self if case.name not in indices]
-        return consistent_subset
+    def unique_removals(self, method="exact", make_consistent=False, n_jobs=1):
+        """
+        Determine the cases to remove so that no inconsistent forcings remain
+        using the unique fact situations, with the same methods and n_jobs as
+        determine_removals. As in get_forcings, make_consistent indicates
+        that the alphas are not used to filter the forcings.
+        """
+        alphas = self._forcing_alphas(make_consistent)
+        if method == "greedy":
+            return self.get_unique().greedy_removals(alphas)
+        elif method != "exact" and method != "weighted":
+            raise ValueError("Unknown method for determining removals.")
+        elif method == "weighted" and self.auth_method == "default":
+            raise ValueError("Weighted removals require an auth_method.")
+        weights = (
+            self._removal_weights() if method == "weighted" else np.ones(len(self))
+        )
+        return self.get_unique().removals(weights, alphas, n_jobs)
 
-    def get_forcings(self, inds, make_consistent=False):
+    def count_inconsistent_forcings(self, make_consistent=False):
+        """
+        Return the number of inconsistent forcings, as get_n_inconst_forcings
+        does for the forcings of all cases, using the unique fact situations
+        if 'dedup' is set.
+        """
+        if self.dedup:
+            alphas = self._forcing_alphas(make_consistent)
+            return self.get_unique().n_inconsistent_forcings(alphas)
+        inds = range(len(self))
+        Id = self.get_inconsistent_forcings(inds, make_consistent)
+        return self.get_n_inconst_forcings(Id)
+
+    def _forcing_alphas(self, make_consistent):
+        # The alphas that restrict the inconsistent forcings, if any.
         if self.auth_method == "default" or make_consistent:
-            return {(i, j) for i in tqdm(inds) for j in inds if self[i] <= self[j]}
+            return None
+        return self.get_alphas()
+
+    def get_dominance_matrix(self):
+        """
+        Return the boolean matrix M where M[i, j] holds iff self[i] <= self[j].
+        The matrix is computed once and reused until the cases change.
+        """
+        if self._dominance is None:
+            store = self.store
+            self._dominance = dominance_matrix(
+                store.ranks, store.tables, store.outcomes
+            )
+            self._buffer = self._dominance
+        return self._dominance
+
+    def get_dominance_bits(self, path=None):
+        """
+        Return the dominance matrix (see get_dominance_matrix) as a bit-packed
+        BitMatrix, kept in memory or, if a path is given, in a memory-mapped
+        file at that path. It takes n^2 / 8 bytes and is filled tile by tile,
+        so it is suited for case bases whose dense matrix does not fit in
+        memory. Once computed, the agreement counts, the forcings and the
+        landmarks are computed from it. It is discarded when the cases change.
+        """
+        if self._bits is None:
+            if self._dominance is not None:
+                blocks = self._forcing_blocks(np.ones(len(self), dtype=bool))
+            else:
+                store = self.store
+                blocks = dominance_blocks(store.ranks, store.tables, store.outcomes)
+            self._bits = BitMatrix.from_blocks(len(self), blocks, path)
+        return self._bits
+
+    def get_outcomes(self):
+        return self.store.outcomes
+
+    def get_alphas(self):
+        return self.store.alphas
+
+    def get_forcings(self, inds, make_consistent=False):
+        """
+        Return the forcings between the cases in inds, i.e. the pairs (i, j)
+        with self[i] <= self[j] (and alpha_i <= alpha_j if an auth_method is
+        used, unless make_consistent is set), as a sparse Relation. It is
+        built block by block from the dominance matrix if that is computed,
+        and from the rank matrix otherwise, so that no dense matrix is needed.
+        """
+        n = len(self)
+        member = np.zeros(n, dtype=bool)
+        member[np.asarray(inds, dtype=np.int64)] = True
+        alpha_order = None
+        if self.auth_method != "default" and not make_consistent:
+            alpha_order = "le"
+        return Relation.from_blocks(n, self._forcing_blocks(member, alpha_order))
+
+    def _forcing_blocks(self, member, alpha_order=None, other_outcome=False):
+        # Yield the pairs (i, j) of members with self[i] <= self[j] in blocks
+        # of rows, restricted as in dominance.dominance_blocks. Without a
+        # dominance matrix, the restrictions prune the pairs to compare.
+        store = self.store
+        alphas = self.get_alphas()
+        if self._dominance is None and self._bits is None:
+            blocks = dominance_blocks(
+                store.ranks,
+                store.tables,
+                store.outcomes,
+                alphas=alphas,
+                alpha_order=alpha_order,
+                other_outcome=other_outcome,
+            )
+            for rows, block in blocks:
+                yield rows[member[rows]], block[member[rows]] & member
+            return
+
+        if self._dominance is not None:
+            size = max(1, BLOCK_PAIRS // max(len(self), 1))
+            starts = range(0, len(self), size)
+            blocks = ((np.arange(i, min(i + size, len(self))), None) for i in starts)
         else:
-            return {
-                (i, j)
-                for i in tqdm(inds)
-                for j in inds
-                if self[i] <= self[j] and self[i].alpha <= self[j].alpha
-            }
+            blocks = self._bits.iter_rows()
+        s = store.outcomes
+        for rows, block in blocks:
+            if block is None:
+                block = self._dominance[rows]
+            rows, block = rows[member[rows]], block[member[rows]] & member
+            if alpha_order is not None:
+                relation = ALPHA_ORDERS[alpha_order]
+                block &= relation(alphas[rows][:, None], alphas[None, :])
+            if other_outcome:
+                block &= s[rows][:, None] != s[None, :]
+            yield rows, block
+
+    def get_inconsistent_forcings(self, inds, make_consistent=False):
+        """
+        Return the inconsistent forcings between the cases in inds, i.e. the
+        result of determine_inconsistent_forcings for the forcings returned by
+        get_forcings, but computed block by block without the forcings.
+        """
+        n = len(self)
+        member = np.zeros(n, dtype=bool)
+        member[np.asarray(inds, dtype=np.int64)] = True
+
+        # A forcing requires alpha_i <= alpha_j, and an inconsistent one
+        # alpha_i >= alpha_j, so that the alphas must be equal.
+        alpha_order = None
+        if self.auth_method != "default":
+            alpha_order = "ge" if make_consistent else "eq"
+        blocks = self._forcing_blocks(member, alpha_order, other_outcome=True)
+        return Relation.from_blocks(n, blocks).symmetric()
+
+    def get_landmarks(self):
+        """
+        Return a boolean array indicating which cases are landmarks, i.e.
+        cases i such that there is no case j != i with the same outcome for
+        which self[j] <= self[i].
+        """
+        return self.get_precedent_counts()[0] == 0
+
+    def get_precedent_counts(self, alphas=()):
+        """
+        Return an array holding for every case i the number of cases j != i
+        with the same outcome for which self[j] <= self[i], i.e. its
+        precedents without relevant differences, and an array holding for
+        every array in alphas the highest alpha of such a precedent (or -inf
+        if there is none). These are column counts of the dominance matrix,
+        taken from it or its bit matrix if either is computed.
+        """
+        n = len(self)
+        s = self.get_outcomes()
+        counts = np.zeros(n, dtype=np.int64)
+        tops = np.full((len(alphas), n), -np.inf)
+        for rows, block in self._forcing_blocks(np.ones(n, dtype=bool)):
+            block &= s[rows][:, None] == s[None, :]
+            block[np.arange(len(rows)), rows] = False
+            counts += block.sum(axis=0)
+            for top, a in zip(tops, alphas):
+                values = np.where(block, np.asarray(a, float)[rows][:, None], -np.inf)
+                np.maximum(top, values.max(axis=0), out=top)
+        return counts, tops
 
     def determine_inconsistent_forcings(self, inds, F):
-        # Separate from F the forcings that lead to inconsistency.
-        if self.auth_method == "default":
-            I = {(i, j) for (i, j) in F if self[i].s != self[j].s}
-        else:
-            I = {
-                (i, j)
-                for (i, j) in F
-                if self[i].s != self[j].s and self[i].alpha >= self[j].alpha
-            }
-        Id = {i: set() for i in inds}
-        for i, j in I:
-            Id[i] |= {j}
-            Id[j] |= {i}
-        return Id
+        """
+        Separate from the forcings F (see get_forcings) those that lead to
+        inconsistency. Returns the symmetric Relation holding the pairs of
+        cases with an inconsistent forcing between them.
+        """
+        if not isinstance(F, Relation):
+            F = np.array(list(F), dtype=np.int64).reshape(-1, 2)
+            F = Relation.from_pairs(len(self), F[:, 0], F[:, 1])
+        I, J = F.pairs()
+        s = self.get_outcomes()
+        keep = s[I] != s[J]
+        if self.auth_method != "default":
+            alphas = self.get_alphas()
+            keep &= alphas[I] >= alphas[J]
+        return F.filter(keep).symmetric()
 
     def get_n_inconst_forcings(self, Id):
+        if isinstance(Id, Relation):
+            return len(Id)
         return sum([len(Id[i]) for i in Id])
@@ -0,0 +1,167 @@
+# Exact consistency repair. Inconsistent forcings only relate cases with
+# different outcomes, so the conflict graph is bipartite and by Kőnig's
+# theorem a minimum vertex cover (i.e. a minimum set of cases to remove)
+# can be obtained from a maximum matching. A minimum weight vertex cover is
+# obtained from a minimum cut instead.
+from collections import deque
+
+import numpy as np
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from scipy.sparse.csgraph import (
+    breadth_first_order,
+    connected_components,
+    maximum_bipartite_matching,
+    maximum_flow,
+)
+
+from relation import Relation
+
+# The capacities of a flow network are scaled to integers below this bound.
+CAPACITY = 1 << 30
+
+
+def conflict_edges(Id):
+    """
+    Return the edges {i, j} of the conflict graph Id, a symmetric Relation or
+    a dictionary mapping cases to sets of cases, as two index arrays.
+    """
+    if isinstance(Id, Relation):
+        I, J = Id.pairs()
+        return I[I < J], J[I < J]
+    edges = [(i, j) for i in Id for j in Id[i] if i < j]
+    edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+    return edges[:, 0], edges[:, 1]
+
+
+def minimum_removals(Id, s, n_jobs=1):
+    """
+    Determine a minimum set of cases whose removal resolves all conflicts.
+
+    The conflict graph is split into its connected components, and for each
+    component a maximum matching is computed with the Hopcroft-Karp algorithm,
+    from which a minimum vertex cover is derived. Components are processed in
+    parallel if n_jobs != 1.
+
+    Args:
+        Id: The symmetric Relation holding the pairs of cases with an
+            inconsistent forcing between them (see
+            CaseBase.determine_inconsistent_forcings), or a dictionary mapping
+            case indices to the sets of indices of those cases.
+        s: An array holding the outcome of every case.
+        n_jobs: Number of parallel jobs (-1 = use all cores).
+    """
+    covers = Parallel(n_jobs=n_jobs)(
+        delayed(_component_cover)(I, J) for I, J in _components(*conflict_edges(Id), s)
+    )
+    return sorted(int(k) for cover in covers for k in cover)
+
+
+def weighted_removals(Id, s, weights, n_jobs=1):
+    """
+    Determine a set of cases of minimum total weight whose removal resolves
+    all conflicts, e.g. using the alphas of the cases as weights so that as
+    little authoritativeness as possible is removed.
+
+    For each connected component of the conflict graph a minimum cut is
+    computed in the network source -> case with outcome 1 -> other case ->
+    sink, where the edges from the source and to the sink have the weights of
+    the cases as capacities. The weights are scaled to integer capacities per
+    component, so the result is minimal up to a relative precision of 2^-30.
+
+    Returns the sorted list of removed cases and their total weight.
+    """
+    return weighted_cover(*conflict_edges(Id), s, weights, n_jobs)
+
+
+def weighted_cover(I, J, s, weights, n_jobs=1):
+    """
+    Determine a minimum weight vertex cover of the conflict graph with edges
+    {I[k], J[k]}, where s holds the outcome of every node, see
+    weighted_removals. Returns the sorted list of nodes in the cover and
+    their total weight.
+    """
+    weights = np.asarray(weights, dtype=float)
+    covers = Parallel(n_jobs=n_jobs)(
+        delayed(_component_weighted_cover)(I, J, weights)
+        for I, J in _components(I, J, s)
+    )
+    removed = sorted(int(k) for cover in covers for k in cover)
+    return removed, float(weights[removed].sum())
+
+
+def _components(I, J, s):
+    # Yield the edges of every connected component of the conflict graph,
+    # oriented from the case with outcome 1 to the other case.
+    I, J = np.asarray(I, dtype=np.int64), np.asarray(J, dtype=np.int64)
+    if len(I) == 0:
+        return
+    left = s[I] == 1
+    I, J = np.where(left, I, J), np.where(left, J, I)
+
+    n = len(s)
+    A = sp.coo_matrix((np.ones(len(I)), (I, J)), shape=(n, n))
+    _, labels = connected_components(A, directed=False)
+    order = np.argsort(labels[I], kind="stable")
+    I, J = I[order], J[order]
+    bounds = np.flatnonzero(np.diff(labels[I])) + 1
+    yield from zip(np.split(I, bounds), np.split(J, bounds))
+
+
+def _component_cover(I, J):
+    # Compute a minimum vertex cover of a bipartite graph with edges (I, J).
+    L, li = np.unique(I, return_inverse=True)
+    R, ri = np.unique(J, return_inverse=True)
+    li, ri = li.reshape(-1), ri.reshape(-1)
+    B = sp.csr_matrix((np.ones(len(li)), (li, ri)), shape=(len(L), len(R)))
+    match_l = maximum_bipartite_matching(B, perm_type="column")
+    match_r = np.full(len(R), -1)
+    matched = np.flatnonzero(match_l >= 0)
+    match_r[match_l[matched]] = matched
+
+    # Find the vertices reachable from the unmatched left vertices by
+    # alternating paths (Kőnig's theorem).
+    seen_l = match_l < 0
+    seen_r = np.zeros(len(R), dtype=bool)
+    queue = deque(np.flatnonzero(seen_l).tolist())
+    while queue:
+        u = queue.popleft()
+        for v in B.indices[B.indptr[u] : B.indptr[u + 1]]:
+            if not seen_r[v]:
+                seen_r[v] = True
+                w = match_r[v]
+                if w >= 0 and not seen_l[w]:
+                    seen_l[w] = True
+                    queue.append(w)
+
+    return np.concatenate([L[~seen_l], R[seen_r]])
+
+
+def _component_weighted_cover(I, J, weights):
+    # Compute a minimum weight vertex cover of a bipartite graph with edges
+    # (I, J) from a minimum cut, with the source and sink as the last nodes.
+    L, li = np.unique(I, return_inverse=True)
+    R, ri = np.unique(J, return_inverse=True)
+    li, ri = li.reshape(-1), ri.reshape(-1)
+    nl, nr = len(L), len(R)
+    source, sink = nl + nr, nl + nr + 1
+
+    w = np.concatenate([weights[L], weights[R]])
+    scale = CAPACITY / w.sum() if w.sum() > 0 else 0
+    caps = np.round(w * scale).astype(np.int32)
+    tails = np.concatenate([np.full(nl, source), li, nl + np.arange(nr)])
+    heads = np.concatenate([np.arange(nl), nl + ri, np.full(nr, sink)])
+    values = np.concatenate(
+        [caps[:nl], np.full(len(li), CAPACITY + 1, dtype=np.int32), caps[nl:]]
+    )
+    C = sp.csr_matrix((values, (tails, heads)), shape=(nl + nr + 2,) * 2)
+    flow = maximum_flow(C, source, sink).flow
+
+    # The source side of the cut consists of the nodes reachable in the
+    # residual network; the cover consists of the cut edges.
+    residual = (C - flow).tocsr()
+    residual.data = (residual.data > 0).astype(np.int32)
+    residual.eliminate_zeros()
+    reachable = np.zeros(nl + nr + 2, dtype=bool)
+    reachable[breadth_first_order(residual, source, return_predecessors=False)] = True
+    return np.concatenate([L[~reachable[:nl]], R[reachable[nl : nl + nr]]])
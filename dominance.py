@@ -0,0 +1,435 @@
+# A vectorized engine for the a fortiori relation between cases.
+# Every dimension is encoded once as a column of integers, after which
+# 'case i <= case j' can be evaluated for many pairs at once using NumPy.
+import operator
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+# The number of pairs compared per block, chosen such that a boolean block
+# (and the temporaries used to compute it) stays roughly within the L2 cache.
+BLOCK_PAIRS = 1 << 20
+
+
+def encode_dimension(dim, values):
+    """
+    Encode the values of a single dimension as integers.
+
+    Returns a pair (codes, table). If the order of the dimension is total,
+    then table is None and the codes are ranks, such that dim.le(x, y) holds
+    if and only if rank(x) <= rank(y). Otherwise the codes index the unique
+    values and table[a, b] holds the result of dim.le for that pair of values.
+    """
+    codes, uniques = pd.factorize(
+        pd.Series(values, dtype=object), use_na_sentinel=False
+    )
+    uniques = np.asarray(uniques, dtype=object)
+    has_na = pd.isna(uniques).any()
+
+    # The ordinary orders on numbers are total, so sorting gives the ranks.
+    if (dim.le is operator.le or dim.le is operator.ge) and not has_na:
+        try:
+            order = np.argsort(uniques, kind="stable")
+        except TypeError:
+            order = None
+        if order is not None:
+            if dim.le is operator.ge:
+                order = order[::-1]
+            ranks = np.empty(len(uniques), dtype=np.int64)
+            ranks[order] = np.arange(len(uniques))
+            return ranks[codes], None
+
+    # A compiled order provides the table directly, where values outside of
+    # the order are only comparable to themselves.
+    if getattr(dim, "reach", None) is not None:
+        idx = np.array([dim.index.get(x, -1) for x in uniques], dtype=np.int64)
+        known = idx >= 0
+        table = dim.reach[np.ix_(idx, idx)] & known[:, None] & known[None, :]
+        unknown = np.flatnonzero(~known)
+        table[unknown, unknown] = True
+
+    # Any other order is evaluated once for every pair of unique values.
+    else:
+        table = np.array(
+            [[bool(dim.le(x, y)) for y in uniques] for x in uniques], dtype=bool
+        ).reshape(len(uniques), len(uniques))
+    ranks = total_preorder_ranks(table)
+    if ranks is not None:
+        return ranks[codes], None
+    return codes.astype(np.int64), table
+
+
+def compare_value(dim, column, v):
+    """
+    Return two boolean arrays holding dim.le(v, x), respectively dim.le(x, v),
+    for every value x in column.
+    """
+    if dim.le is operator.le or dim.le is operator.ge:
+        try:
+            return np.asarray(dim.le(v, column), bool), np.asarray(
+                dim.le(column, v), bool
+            )
+        except TypeError:
+            pass
+    codes, uniques = pd.factorize(
+        pd.Series(column, dtype=object), use_na_sentinel=False
+    )
+    fw = np.array([bool(dim.le(v, x)) for x in uniques], dtype=bool)
+    bw = np.array([bool(dim.le(x, v)) for x in uniques], dtype=bool)
+    return fw[codes], bw[codes]
+
+
+def total_preorder_ranks(table):
+    """
+    Return ranks for the values of a relation table if it is a total preorder,
+    i.e. such that table[a, b] holds iff rank[a] <= rank[b], and None otherwise.
+    """
+    if not (table | table.T).all():
+        return None
+    t = table.astype(np.int64)
+    if ((t @ t > 0) & ~table).any():
+        return None
+    return table.sum(axis=0)
+
+
+def encode_columns(D, columns):
+    """
+    Encode the columns of a case base, given as a dictionary mapping the names
+    of the dimensions in D to arrays of values, as a rank matrix with one
+    column per dimension and a list holding for each dimension either None or
+    its relation table.
+    """
+    dims = list(D)
+    n = len(columns[dims[0]]) if dims else 0
+    ranks = np.zeros((n, len(dims)), dtype=np.int64)
+    tables = []
+    for k, d in enumerate(dims):
+        codes, table = encode_dimension(D[d], columns[d])
+        ranks[:, k] = codes
+        tables.append(table)
+    return ranks, tables
+
+
+def binary_dimensions(ranks, tables):
+    """
+    Split the dimensions into those with at most two ranks and the others.
+    Returns the binary dimensions packed into words of 64 bits per case (see
+    pack_bits), where a bit is set for the higher rank, so that the order is
+    folded into the bits: case i <= case j on these dimensions in the
+    direction of the plaintiff iff (bits[i] & ~bits[j]) == 0 for every word.
+    The indices of the other dimensions are returned as well.
+    """
+    if len(ranks) == 0:
+        return None, list(range(len(tables)))
+    lo, hi = ranks.min(axis=0), ranks.max(axis=0)
+    two = ((ranks == lo) | (ranks == hi)).all(axis=0)
+    binary = [k for k, t in enumerate(tables) if t is None and two[k]]
+    rest = [k for k in range(len(tables)) if k not in binary]
+    if not binary:
+        return None, rest
+    return pack_bits(ranks[:, binary] == hi[binary]), rest
+
+
+def _compare_block(ranks, tables, rows, cols, up, bits=None, rest=None, acc=None):
+    # Evaluate rows <= cols, where 'up' indicates whether the rows are
+    # compared in the direction of the plaintiff (outcome 1) or not. The
+    # binary dimensions may be given as packed bits, see binary_dimensions.
+    # If acc is given, only the pairs for which it holds are considered.
+    if acc is None:
+        acc = np.ones((len(rows), len(cols)), dtype=bool)
+    if bits is not None:
+        for w in range(bits.shape[1]):
+            a = bits[rows, w][:, None]
+            b = bits[cols, w][None, :]
+            acc &= ((a & ~b) if up else (b & ~a)) == 0
+    for k in range(len(tables)) if rest is None else rest:
+        table = tables[k]
+        a = ranks[rows, k][:, None]
+        b = ranks[cols, k][None, :]
+        if table is None:
+            acc &= (a <= b) if up else (a >= b)
+        else:
+            acc &= table[a, b] if up else table[b, a]
+        if not acc.any():
+            break
+    return acc
+
+
+def dimension_blocks(ranks, tables, k, up, block_pairs=BLOCK_PAIRS):
+    """
+    Yield pairs (rows, block) where block[a, b] holds iff the value of case
+    rows[a] in dimension k is <= that of case b if 'up', and >= otherwise.
+    """
+    n = len(ranks)
+    cols = np.arange(n)
+    size = max(1, block_pairs // max(n, 1))
+    for i in range(0, n, size):
+        rows = cols[i : i + size]
+        yield rows, _compare_block(ranks, tables, rows, cols, up, rest=[k])
+
+
+# The relations that can be required between the alphas of the cases i and j
+# in the pairs (i, j) yielded by dominance_blocks.
+ALPHA_ORDERS = {"le": operator.le, "ge": operator.ge, "eq": operator.eq}
+
+
+def dominance_blocks(
+    ranks,
+    tables,
+    s,
+    block_pairs=BLOCK_PAIRS,
+    verb=True,
+    alphas=None,
+    alpha_order=None,
+    other_outcome=False,
+):
+    """
+    Yield pairs (rows, block) where block[a, b] holds iff case rows[a] <= case b,
+    comparing in the direction of the outcome of case rows[a]. The rows of a
+    block are in increasing order. See candidate_blocks for the pruning, and
+    for the restrictions given by alphas, alpha_order and other_outcome.
+    """
+    n = len(s)
+    blocks = candidate_blocks(
+        ranks, tables, s, block_pairs, verb, alphas, alpha_order, other_outcome
+    )
+    for rows, cols, acc in blocks:
+        block = np.zeros((len(rows), n), dtype=bool)
+        block[:, cols] = acc
+        yield rows, block
+
+
+def candidate_blocks(
+    ranks,
+    tables,
+    s,
+    block_pairs=BLOCK_PAIRS,
+    verb=True,
+    alphas=None,
+    alpha_order=None,
+    other_outcome=False,
+):
+    """
+    Yield triples (rows, cols, acc) where acc[a, b] holds iff case rows[a] <=
+    case cols[b], comparing in the direction of the outcome of case rows[a],
+    such that no case outside of cols is >= a case in rows. The rows of a
+    block are in increasing order.
+
+    If case i <= case j in the direction of the plaintiff, then the sum of
+    the ranks of i in the dimensions with a total order is at most that of j,
+    and every such rank of i is at most that of j (and conversely for the
+    defendant). The rows are therefore grouped into blocks by their rank
+    sums, and only compared with the cases whose rank sums and ranks are
+    within the bounds of the block.
+
+    If alpha_order is given, only the pairs (i, j) for which the relation
+    ALPHA_ORDERS[alpha_order](alphas[i], alphas[j]) holds are yielded. The
+    rows are then grouped by their alphas instead, and the candidates are
+    found by binary search in the cases sorted by alpha. If other_outcome is
+    set, only the pairs of cases with different outcomes are yielded.
+    """
+    n = len(s)
+    size = max(1, block_pairs // max(n, 1))
+    bits, rest = binary_dimensions(ranks, tables)
+    total = ranks[:, [k for k, t in enumerate(tables) if t is None]]
+    key = total.sum(axis=1)
+    by = key if alpha_order is None else np.asarray(alphas, float)
+    order = np.argsort(by, kind="stable")
+    sorted_by = by[order]
+    up = s == 1
+    groups = [(np.flatnonzero(up), True), (np.flatnonzero(~up), False)]
+    groups = [(g[np.argsort(by[g], kind="stable")], u) for g, u in groups]
+    starts = [(g, u, i) for g, u in groups for i in range(0, len(g), size)]
+    for g, u, i in tqdm(starts, disable=not verb):
+        rows = np.sort(g[i : i + size])
+        if alpha_order is None:
+            cols = _sorted_range(order, sorted_by, by[rows], "le" if u else "ge")
+        else:
+            cols = _sorted_range(order, sorted_by, by[rows], alpha_order)
+        if other_outcome and (s[rows] == s[rows[0]]).all():
+            cols = cols[s[cols] != s[rows[0]]]
+        cols = _candidates(total, key, rows, cols, u)
+        acc = np.ones((len(rows), len(cols)), dtype=bool)
+        if alpha_order is not None:
+            acc &= ALPHA_ORDERS[alpha_order](by[rows][:, None], by[cols][None, :])
+        if other_outcome:
+            acc &= s[rows][:, None] != s[cols][None, :]
+        yield rows, cols, _compare_block(ranks, tables, rows, cols, u, bits, rest, acc)
+
+
+def _sorted_range(order, sorted_values, values, relation):
+    # The cases j, given in order of their values, for which the relation
+    # (see ALPHA_ORDERS) between a value of rows and that of j may hold.
+    lo = np.searchsorted(sorted_values, values.min(), side="left")
+    hi = np.searchsorted(sorted_values, values.max(), side="right")
+    if relation == "le":
+        return order[lo:]
+    if relation == "ge":
+        return order[:hi]
+    return order[lo:hi]
+
+
+def _candidates(ranks, key, rows, cols, up):
+    # The cases in cols that rows may be <= of, given the ranks of the
+    # dimensions with a total order and their sums 'key'.
+    if up:
+        keep = key[cols] >= key[rows].min()
+        keep &= (ranks[cols] >= ranks[rows].min(axis=0)).all(axis=1)
+    else:
+        keep = key[cols] <= key[rows].max()
+        keep &= (ranks[cols] <= ranks[rows].max(axis=0)).all(axis=1)
+    return cols[keep]
+
+
+def outcome_counts(ranks, tables, s, block_pairs=BLOCK_PAIRS, verb=True):
+    """
+    Return two arrays holding for every case i the number of cases j with the
+    same outcome, respectively a different outcome, for which case i <= case j.
+    If every order is total, there are at most MAX_DC_DIMS dimensions and at
+    least MIN_DC_CASES cases, the cases are counted by divide and conquer (see
+    dominance_counts) instead of comparing all pairs.
+    """
+    total = all(t is None for t in tables)
+    if total and ranks.shape[1] <= MAX_DC_DIMS and len(s) >= MIN_DC_CASES:
+        return _outcome_counts_dc(ranks, s)
+    n_a = np.zeros(len(s), dtype=np.int64)
+    n_d = np.zeros(len(s), dtype=np.int64)
+    for rows, cols, acc in candidate_blocks(ranks, tables, s, block_pairs, verb):
+        same = s[rows][:, None] == s[cols][None, :]
+        n_a[rows] = (acc & same).sum(axis=1)
+        n_d[rows] = (acc & ~same).sum(axis=1)
+    return n_a, n_d
+
+
+# Above this number of dimensions, or below this number of cases, comparing
+# all pairs is faster than counting by divide and conquer.
+MAX_DC_DIMS = 8
+MIN_DC_CASES = 5000
+
+# Below this number of pairs, dominance_counts compares all pairs.
+LEAF_PAIRS = 1 << 16
+
+
+def _outcome_counts_dc(ranks, s):
+    # Count on the unique rank vectors, weighted by the number of cases with
+    # outcome 1 and with another outcome, in both directions.
+    P, inverse = np.unique(ranks, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    up = s == 1
+    W = np.zeros((len(P), 2), dtype=np.int64)
+    np.add.at(W, (inverse, (~up).astype(np.int64)), 1)
+    counts_up = dominance_counts(P, W, P)[inverse]
+    counts_down = dominance_counts(-P, W, -P)[inverse]
+    n_a = np.where(up, counts_up[:, 0], counts_down[:, 1])
+    n_d = np.where(up, counts_up[:, 1], counts_down[:, 0])
+    return n_a, n_d
+
+
+def dominance_counts(points, weights, queries):
+    """
+    Return for every query q the sum of the weights (a matrix with a column
+    per kind of weight) of the points p with p >= q in every dimension.
+
+    The points and queries are split on the median of the first dimension:
+    the queries below it are dominated by all points above it in that
+    dimension, so these are counted on the remaining dimensions only, and
+    both halves are counted recursively (Bentley's multidimensional divide
+    and conquer). A single remaining dimension is counted by sorting, and
+    small subproblems by comparing all pairs. This takes O(n log^(d-1) n).
+    """
+    out = np.zeros((len(queries), weights.shape[1]), dtype=weights.dtype)
+    dims = list(range(points.shape[1]))
+    stack = [(points, weights, queries, np.arange(len(queries)), dims)]
+    while stack:
+        P, W, Q, rows, dims = stack.pop()
+        if len(P) == 0 or len(Q) == 0:
+            continue
+        if not dims:
+            out[rows] += W.sum(axis=0)
+        elif len(dims) == 1:
+            k = dims[0]
+            order = np.argsort(P[:, k], kind="stable")
+            cum = np.concatenate(
+                [np.zeros((1, W.shape[1]), W.dtype), W[order].cumsum(0)]
+            )
+            pos = np.searchsorted(P[order, k], Q[:, k], side="left")
+            out[rows] += cum[-1] - cum[pos]
+        elif len(P) * len(Q) <= LEAF_PAIRS:
+            acc = np.ones((len(Q), len(P)), dtype=bool)
+            for k in dims:
+                acc &= Q[:, k][:, None] <= P[:, k][None, :]
+            out[rows] += acc.astype(W.dtype) @ W
+        else:
+            k = dims[0]
+            values = np.concatenate([P[:, k], Q[:, k]])
+            m = np.partition(values, len(values) // 2)[len(values) // 2]
+            if m == values.min():
+                higher = values[values > m]
+                if len(higher) == 0:
+                    stack.append((P, W, Q, rows, dims[1:]))
+                    continue
+                m = higher.min()
+            hp = P[:, k] >= m
+            hq = Q[:, k] >= m
+            stack.append((P[hp], W[hp], Q[hq], rows[hq], dims))
+            stack.append((P[hp], W[hp], Q[~hq], rows[~hq], dims[1:]))
+            stack.append((P[~hp], W[~hp], Q[~hq], rows[~hq], dims))
+    return out
+
+
+def dominance_matrix(ranks, tables, s, block_pairs=BLOCK_PAIRS, verb=True):
+    """Return the boolean matrix M where M[i, j] holds iff case i <= case j."""
+    n = len(s)
+    M = np.zeros((n, n), dtype=bool)
+    for rows, block in dominance_blocks(ranks, tables, s, block_pairs, verb):
+        M[rows] = block
+    return M
+
+
+def le_rows(ranks, tables, rows, j, up):
+    """
+    Return the boolean matrix holding, for every case in rows and every
+    dimension, whether the value of that case is <= the value of case j, in
+    the direction of the plaintiff if 'up' and of the defendant otherwise.
+    """
+    a = ranks[rows]
+    b = ranks[j]
+    mask = (a <= b) if up else (a >= b)
+    for k, table in enumerate(tables):
+        if table is not None:
+            mask[:, k] = table[a[:, k], b[k]] if up else table[b[k], a[:, k]]
+    return mask
+
+
+def le_against(ranks, tables, i, cols, up):
+    """
+    Return the boolean matrix holding, for every case in cols and every
+    dimension, whether the value of case i is <= the value of that case, in
+    the direction of the plaintiff if 'up' and of the defendant otherwise.
+    """
+    a = ranks[i]
+    b = ranks[cols]
+    mask = (a <= b) if up else (a >= b)
+    for k, table in enumerate(tables):
+        if table is not None:
+            mask[:, k] = table[a[k], b[:, k]] if up else table[b[:, k], a[k]]
+    return mask
+
+
+# The number of set bits for every possible byte.
+POPCOUNT8 = np.array([bin(b).count("1") for b in range(256)], dtype=np.int64)
+
+
+def pack_bits(mask):
+    """Pack the rows of a boolean matrix into words of 64 bits."""
+    n, m = mask.shape
+    width = max(1, (m + 63) // 64)
+    packed = np.zeros((n, width * 8), dtype=np.uint8)
+    packed[:, : (m + 7) // 8] = np.packbits(mask, axis=1, bitorder="little")
+    return packed.view(np.uint64)
+
+
+def popcount(words):
+    """Count the set bits in every row of a matrix of packed words."""
+    return POPCOUNT8[words.view(np.uint8)].sum(axis=1)
@@ -1,101 +1,201 @@
-import pandas as pd
-
+from authoritativeness import harmonic_alphas
 from case_base import CaseBase
-from precedents import get_precedent_distribution
+from orders import OrderCache
+from precedents import get_precedent_distribution, shared_precedent_distributions
 
 
-def experiment(exp_dict):
-    m = "pearson"
+def experiment(exp_dict, order_cache=None):
+    """
+    Run the experiments in exp_dict. The orders of every dataset are learned
+    once and shared by all auth methods through the order cache, which may be
+    given to keep it on disk (see orders.OrderCache).
+    """
+    order_cache = OrderCache() if order_cache is None else order_cache
     for name in exp_dict:
-        path = exp_dict[name]["path"]
-        full_experiments = exp_dict[name].get("Full dataset")
-        if full_experiments:
-            make_consistent = False
-            auth_methods = full_experiments["auth_methods"]
-            print("\n===========================================")
-            print(
-                f"Analysing {name} using the {m} method with make_consistent={make_consistent}."
-            )
-            for auth_method in auth_methods:
-                full_experiments["auth_methods"][auth_method] = evaluate_dataset(
-                    path, auth_method, make_consistent, m
-                )
-
-        consistent_experiments = exp_dict[name].get("Consistent subset")
-        if consistent_experiments:
-            make_consistent = True
-            auth_methods = consistent_experiments["auth_methods"]
-            print("\n===========================================")
-            print(
-                f"Analysing {name} using the {m} method with make_consistent={make_consistent}."
-            )
-            for auth_method in auth_methods:
-                consistent_experiments["auth_methods"][auth_method] = evaluate_dataset(
-                    path, auth_method, make_consistent, m
-                )
+        experiment_single_dataset(name, exp_dict[name], order_cache)
     return exp_dict
 
 
-def evaluate_dataset(path, auth_method, make_consistent=False, m="pearson", df=None):
-    results = {}
+def evaluate_dataset(
+    path,
+    auth_method,
+    make_consistent=False,
+    m="pearson",
+    df=None,
+    removal_method="greedy",
+    artifact=None,
+    order_cache=None,
+    n_jobs=1,
+):
+    """
+    Evaluate the dataset at path. If 'artifact' is given, the compiled case
+    base is loaded from (or saved to) that directory, see CaseBase.from_csv.
+    The orders are taken from the order cache if one is given. See
+    evaluate_case_base for n_jobs.
+    """
     print(f"\nEvaluating for auth_method={auth_method}...")
     if df is None:
-        df = pd.read_csv(path)
-    CB = CaseBase(df, verb=True, method=m, auth_method=auth_method)
-
+        CB = CaseBase.from_csv(
+            path,
+            artifact,
+            verb=True,
+            order_cache=order_cache,
+            method=m,
+            auth_method=auth_method,
+        )
+    else:
+        CB = CaseBase(
+            df, verb=True, method=m, auth_method=auth_method, order_cache=order_cache
+        )
+    return evaluate_case_base(CB, make_consistent, removal_method, n_jobs=n_jobs)
+
+
+def evaluate_case_base(
+    CB, make_consistent=False, removal_method="greedy", precedents=None, n_jobs=1
+):
+    """
+    Evaluate a case base. The precedent distribution can be given as
+    'precedents' if it is already known, e.g. from a PrecedentStatistics.
+    The removals are determined with n_jobs parallel jobs, see
+    CaseBase.determine_removals.
+    """
     if make_consistent:
         initial_size = len(CB)
         print(f"Initial size: {initial_size}.")
-        CB.take_consistent_subset()
+        CB.take_consistent_subset(removal_method, n_jobs)
         reduced_size = len(CB)
         print(f"Reduced size: {reduced_size}.")
         print(
             f"Removed {initial_size - reduced_size} ({100*(initial_size - reduced_size)/initial_size} %)."
         )
 
-    results = get_precedent_distribution(CB)
+    if precedents is None:
+        results = get_precedent_distribution(CB)
+    else:
+        results = dict(precedents)
 
-    inds = range(len(CB))
-    forcings = CB.get_forcings(inds, make_consistent)
-    Id = CB.determine_inconsistent_forcings(inds, forcings)
-    results["Inconsistent forcings"] = CB.get_n_inconst_forcings(Id)
+    # With unique fact situations, forcings are counted per pair of groups.
+    if CB.dedup:
+        results["Inconsistent forcings"] = CB.count_inconsistent_forcings(
+            make_consistent
+        )
+        inconsistent_indices = CB.unique_removals(
+            removal_method, make_consistent, n_jobs
+        )
+    else:
+        inds = range(len(CB))
+        Id = CB.get_inconsistent_forcings(inds, make_consistent)
+        results["Inconsistent forcings"] = CB.get_n_inconst_forcings(Id)
+        inconsistent_indices = CB.determine_removals(inds, Id, removal_method, n_jobs)
 
     # Calculate N_del
-    inconsistent_indices = CB.determine_removals(inds, Id)
     results["N_del"] = len(inconsistent_indices)
+    if removal_method == "weighted":
+        results["Removed alpha"] = float(CB.get_alphas()[inconsistent_indices].sum())
 
     return results
 
 
-def experiment_single_dataset(name, dataset_config):
-    """Process a single dataset and return results."""
-    m = "pearson"
-    path = dataset_config["path"]
+def evaluate_auth_methods(
+    CB, auth_methods, make_consistent=False, removal_method="greedy"
+):
+    """
+    Evaluate a case base for several auth methods at once. The dominance
+    matrix and the agreement counts are computed once, and every auth method
+    is evaluated on a copy of the case base that shares them, see
+    CaseBase.with_auth_method. Without make_consistent, the precedent
+    distributions of all auth methods are computed in a single pass as well.
+    """
+    CB.get_dominance_matrix()
+    CBs = {
+        auth_method: CB.with_auth_method(auth_method) for auth_method in auth_methods
+    }
+    precedents = {}
+    if not make_consistent:
+        alphas = [
+            None if auth_method == "default" else CBs[auth_method].get_alphas()
+            for auth_method in auth_methods
+        ]
+        distributions = shared_precedent_distributions(CB, alphas)
+        precedents = dict(zip(auth_methods, distributions))
 
-    full_experiments = dataset_config.get("Full dataset")
-    if full_experiments:
-        make_consistent = False
-        auth_methods = full_experiments["auth_methods"]
-        print("\n===========================================")
-        print(
-            f"Analysing {name} using the {m} method with make_consistent={make_consistent}."
+    results = {}
+    for auth_method in auth_methods:
+        print(f"\nEvaluating for auth_method={auth_method}...")
+        results[auth_method] = evaluate_case_base(
+            CBs[auth_method],
+            make_consistent,
+            removal_method,
+            precedents.get(auth_method),
         )
-        for auth_method in auth_methods:
-            full_experiments["auth_methods"][auth_method] = evaluate_dataset(
-                path, auth_method, make_consistent, m
-            )
+    return results
 
-    consistent_experiments = dataset_config.get("Consistent subset")
-    if consistent_experiments:
-        make_consistent = True
-        auth_methods = consistent_experiments["auth_methods"]
-        print("\n===========================================")
-        print(
-            f"Analysing {name} using the {m} method with make_consistent={make_consistent}."
+
+def evaluate_betas(
+    CB, betas, make_consistent=False, removal_method="greedy", batch_size=25
+):
+    """
+    Evaluate a case base for the harmonic auth method with every beta in
+    betas, yielding pairs (beta, results) as soon as they are known. The
+    dominance matrix and the agreement counts are computed once, after which
+    the alphas are computed for all betas at once (see harmonic_alphas) and
+    only the filters that depend on the alphas are evaluated per beta.
+    Without make_consistent, the precedent distributions are computed for
+    batches of batch_size betas in a single pass.
+    """
+    CB.get_dominance_matrix()
+    n_a, n_d = CB.get_agreement_counts()
+    alphas = harmonic_alphas(n_a, n_d, len(CB), betas)
+    for i in range(0, len(betas), batch_size):
+        batch = range(i, min(i + batch_size, len(betas)))
+        precedents = [None] * len(batch)
+        if not make_consistent:
+            precedents = shared_precedent_distributions(CB, list(alphas[batch]))
+        for b, p in zip(batch, precedents):
+            view = CB.with_auth_method(f"harmonic_{float(betas[b])}", alphas[b])
+            yield betas[b], evaluate_case_base(view, make_consistent, removal_method, p)
+
+
+def evaluate_orders(
+    CB, variants, make_consistent=False, removal_method="greedy", distribution=False
+):
+    """
+    Evaluate a case base with changed orders, yielding pairs (variant,
+    results) for every variant (flips, drop) in variants, where the orders of
+    the dimensions in flips are reversed and those in drop are left out (see
+    CaseBase.with_orders). The comparison bit-planes of the dimensions are
+    computed once, so that every variant only combines them. The precedent
+    distribution is only computed if 'distribution' is set.
+    """
+    CB.get_planes()
+    for flips, drop in variants:
+        view = CB.with_orders(flips, drop)
+        precedents = None if distribution else {}
+        yield (flips, drop), evaluate_case_base(
+            view, make_consistent, removal_method, precedents
         )
-        for auth_method in auth_methods:
-            consistent_experiments["auth_methods"][auth_method] = evaluate_dataset(
-                path, auth_method, make_consistent, m
+
+
+def experiment_single_dataset(name, dataset_config, order_cache=None):
+    """
+    Process a single dataset and return results. The case base is built
+    once, and all auth methods are evaluated together (see
+    evaluate_auth_methods) for the full dataset and the consistent subsets.
+    """
+    m = "pearson"
+    path = dataset_config["path"]
+    CB = CaseBase.from_csv(path, verb=True, order_cache=order_cache, method=m)
+
+    for key, make_consistent in [("Full dataset", False), ("Consistent subset", True)]:
+        experiments = dataset_config.get(key)
+        if experiments:
+            auth_methods = list(experiments["auth_methods"])
+            print("\n===========================================")
+            print(
+                f"Analysing {name} using the {m} method with make_consistent={make_consistent}."
+            )
+            experiments["auth_methods"].update(
+                evaluate_auth_methods(CB, auth_methods, make_consistent)
             )
 
     return dataset_config
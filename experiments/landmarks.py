@@ -1,55 +1,41 @@
 import numpy as np
 import pandas as pd
 from case_base import CaseBase
-from tqdm import tqdm
 
 
-def analyze(CB):
+def analyze(CB, path=None):
+    """
+    Analyze the forcings, landmarks and consistency of a case base. If a path
+    is given, the dominance matrix is kept bit-packed in a memory-mapped file
+    at that path, so that large case bases can be analyzed out of core.
+    """
     print("\nComputing relevant differences between the cases.")
     inds = range(len(CB))
+    if path is not None:
+        CB.get_dominance_bits(path)
 
-    # Now compute all forcing relations between the cases.
-    F = {(i, j) for i in tqdm(inds) for j in inds if CB[i] <= CB[j]}
-    Fd = {i: [] for i in inds}
-    Fid = {i: [] for i in inds}
-    for i, j in F:
-        Fd[i] += [j]
-        Fid[j] += [i]
-
-    # Separate from F the forcings that lead to inconsistency.
-    I = {(i, j) for (i, j) in F if CB[i].s != CB[j].s}
-    Id = {i: set() for i in inds}
-    for i, j in I:
-        Id[i] |= {j}
-        Id[j] |= {i}
+    # Count the forcings of every case, and separate from them the forcings
+    # that lead to inconsistency.
+    Fd = sum(CB.get_agreement_counts())
+    Id = CB.get_inconsistent_forcings(inds, make_consistent=True)
+    Idd = Id.degrees()
 
     # Gather all landmarks for both classes.
-    ls = {
-        s: [
-            i
-            for i in inds
-            if CB[i].s == s and not any(CB[i].s == CB[j].s for j in Fid[i] if i != j)
-        ]
-        for s in [0, 1]
-    }
+    s = CB.get_outcomes()
+    landmarks = CB.get_landmarks()
+    ls = {s_: np.flatnonzero((s == s_) & landmarks).tolist() for s_ in [0, 1]}
 
     # Make a DataFrame for holding the analysis results.
     adf = pd.DataFrame()
-    adf["Scores"] = [len(Fd[i]) for i in inds]
-    adf["Score (same outcome)"] = [len(Fd[i]) - len(Id[i]) for i in inds]
-    adf["Score (diff outcome)"] = [len(Id[i]) for i in inds]
-    adf["Consistency"] = [int(len(Id[i]) == 0) for i in inds]
-    adf["Label"] = [CB[i].s for i in inds]
-    adf["Landmark"] = [i in ls[CB[i].s] for i in inds]
+    adf["Scores"] = Fd
+    adf["Score (same outcome)"] = Fd - Idd
+    adf["Score (diff outcome)"] = Idd
+    adf["Consistency"] = (Idd == 0).astype(int)
+    adf["Label"] = s
+    adf["Landmark"] = landmarks
 
     # Compute the minimum (?) number of deletions before the CB is consistent.
-    removals = 0
-    while sum(s := [len(Id[i]) for i in inds]) != 0:
-        k = np.argmax(s)
-        for i in inds:
-            Id[i] -= {k}
-        Id[k] = set()
-        removals += 1
+    removals = len(CB.determine_removals(inds, Id))
 
     # Print the results of the analysis.
     print(f"\nNumber of cases: {len(CB)}.")
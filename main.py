@@ -1,15 +1,31 @@
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
+from case_base import CaseBase
 from classifier import kfold_random_forest
 from experiments import authoritativeness
+from orders import OrderCache
 from preprocessing import get_data
 
 
-def generate_table_cell(mean, mean_nontrivial, n_inconsistent_forcings, n_del):
+def generate_table_cell(
+    mean,
+    mean_nontrivial,
+    n_inconsistent_forcings,
+    n_del,
+    mean_error=None,
+    mean_nontrivial_error=None,
+):
+    # The errors are the half-widths of the confidence intervals of estimated
+    # means (see precedents.estimate_precedent_distribution), if any.
     if mean is None:
         return
     mean = round(mean, 2)
     mean_nt = round(mean_nontrivial, 2) if mean_nontrivial is not None else "N/A"
+    if mean_error is not None:
+        mean = f"{mean}\\pm{round(mean_error, 2)}"
+    if mean_nontrivial is not None and mean_nontrivial_error is not None:
+        mean_nt = f"{mean_nt}\\pm{round(mean_nontrivial_error, 2)}"
     return f"\\multicolumn{{1}}{{l|}}{{\\begin{{tabular}}[c]{{@{{}}l@{{}}}}$\\mu={mean}$\\\\ $\\mu_n={mean_nt}$\\\\ $N_{{inc}}={n_inconsistent_forcings}$\\\\ $N_{{del}}={n_del}$\\end{{tabular}}}}"
 
 
@@ -44,7 +60,14 @@ def evaluate_metrics(exp_dict):
                 mu_n = set["auth_methods"][auth_method].get("mean_nontrivial")
                 Ninc = set["auth_methods"][auth_method]["Inconsistent forcings"]
                 Ndel = set["auth_methods"][auth_method].get("N_del", 0)
-                latex_cell = generate_table_cell(mu, mu_n, Ninc, Ndel)
+                latex_cell = generate_table_cell(
+                    mu,
+                    mu_n,
+                    Ninc,
+                    Ndel,
+                    set["auth_methods"][auth_method].get("mean_error"),
+                    set["auth_methods"][auth_method].get("mean_nontrivial_error"),
+                )
                 latex_results += latex_cell
                 if auth_method.startswith("harmonic"):
                     beta = float(auth_method.split("_")[1])
@@ -55,30 +78,82 @@ def evaluate_metrics(exp_dict):
                         "Ninc": [Ninc],
                         "Ndel": [Ndel],
                     }
-                    df_results = df_results.append(pd.DataFrame(data).set_index("beta"))
+                    df_results = pd.concat(
+                        [df_results, pd.DataFrame(data).set_index("beta")]
+                    )
             latex_results += " \\\\\\cline{2-5}"
 
         # Write output immediately
         output_local(name, latex_results, df_results)
 
 
+def evaluate_beta_curve(exp_dict, betas=np.logspace(-2, 2, 200), order_cache=None):
+    """
+    Evaluate the harmonic auth method for every beta in betas on the full
+    datasets in exp_dict, writing a row beta;mu;mu_n;Ninc;Ndel to
+    results/{name}_betas.csv as soon as it is known.
+    """
+    order_cache = OrderCache() if order_cache is None else order_cache
+    for name in exp_dict:
+        CB = CaseBase.from_csv(
+            exp_dict[name]["path"], verb=True, order_cache=order_cache
+        )
+        output_stream(
+            f"{name}_betas",
+            (
+                {
+                    "beta": beta,
+                    "mu": results.get("mean"),
+                    "mu_n": results.get("mean_nontrivial"),
+                    "Ninc": results["Inconsistent forcings"],
+                    "Ndel": results.get("N_del", 0),
+                }
+                for beta, results in authoritativeness.evaluate_betas(CB, betas)
+            ),
+        )
+
+
+def output_stream(name, rows):
+    """
+    Write rows (dictionaries) to results/{name}.csv one at a time, in the
+    format of output_local, where the first column is the index.
+    """
+    import os
+
+    if not os.path.exists("results"):
+        os.makedirs("results")
+    with open(f"results/{name}.csv", "w") as f:
+        for i, row in enumerate(rows):
+            df = pd.DataFrame({k: [v] for k, v in row.items()})
+            df.set_index(df.columns[0]).to_csv(f, sep=";", header=i == 0)
+            f.flush()
+
+
 def grow_Q(Q_total, auth_method="default", percentage=5):
-    Q = pd.DataFrame()
     df_results = pd.DataFrame()
     total_size = len(Q_total)
     interval = max(
         1, int(total_size * percentage / 100)
     )  # Calculate interval from percentage
 
-    for i, (_, row) in enumerate(Q_total.iterrows(), 1):
-        Q = Q.append(row)
+    # The cases are added to the case base one at a time, and the orders are
+    # learned again from the current cases at every checkpoint, so that every
+    # row equals the evaluation of the first |Q| cases.
+    CB = CaseBase(Q_total.iloc[:interval], verb=True, auth_method=auth_method)
+    rows = Q_total.to_dict("records")
+    names = Q_total.index.tolist()
+
+    for i in range(interval, total_size + 1):
+        if i > interval:
+            row = rows[i - 1]
+            CB.add_case(row, row["Label"], names[i - 1])
         if i % interval == 0 or i == total_size:  # Evaluate at intervals or at the end
-            results = authoritativeness.evaluate_dataset(
-                "", auth_method=auth_method, df=Q
-            )
+            if i > interval:
+                CB.relearn_orders()
+            results = authoritativeness.evaluate_case_base(CB)
             n_n = results.get("all") + results.get("some") + results.get("none")
             data = {
-                "|Q|": [len(Q)],
+                "|Q|": [len(CB)],
                 "mu": [results.get("mean")],
                 "mu_n": [results.get("mean_nontrivial")],
                 "Ninc": [results.get("Inconsistent forcings")],
@@ -86,7 +161,7 @@ def grow_Q(Q_total, auth_method="default", percentage=5):
                 "Ntws": [results.get("trivial")],
                 "Nn": [n_n],
             }
-            df_results = df_results.append(pd.DataFrame(data).set_index("|Q|"))
+            df_results = pd.concat([df_results, pd.DataFrame(data).set_index("|Q|")])
     return df_results
 
 
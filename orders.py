@@ -0,0 +1,93 @@
+# A cache for the dimension orders learned by CaseBase.learn_orders. The
+# orders only depend on the data and the parameters used to learn them, and
+# not on e.g. the auth_method, so they can be shared between case bases.
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def data_fingerprint(df):
+    """Return a hash of the columns, index and values of a dataframe."""
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class OrderCache:
+    """
+    Learned orders, i.e. the categorical and ordinal columns, the coefficients
+    and the sorted values of the categorical columns, kept in memory and, if a
+    path is given, as JSON files in that directory. The entries are keyed by
+    the fingerprint of the data and the parameters of learn_orders.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def key(self, df, method, catcs, manords, replace):
+        params = {
+            "data": data_fingerprint(df),
+            "method": method,
+            "catcs": catcs,
+            "manords": {
+                d: sorted(map(repr, o)) if type(o) == set else repr(o)
+                for d, o in manords.items()
+            },
+            "replace": replace,
+        }
+        h = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        """Return the orders stored under key, or None."""
+        if key not in self.entries and self.path is not None:
+            file = self._file(key)
+            if os.path.exists(file):
+                with open(file) as f:
+                    self.entries[key] = json.load(f)
+        return self.entries.get(key)
+
+    def put(self, key, orders):
+        self.entries[key] = orders
+        if self.path is not None:
+            with open(self._file(key), "w") as f:
+                json.dump(_jsonable(orders), f, indent=2)
+
+    def keys(self):
+        """Return the keys of all entries, in memory or on disk."""
+        keys = set(self.entries)
+        if self.path is not None:
+            keys |= {f[:-5] for f in os.listdir(self.path) if f.endswith(".json")}
+        return sorted(keys)
+
+    def invalidate(self, key=None):
+        """Remove the entry stored under key, or all entries if key is None."""
+        for k in self.keys() if key is None else [key]:
+            self.entries.pop(k, None)
+            if self.path is not None and os.path.exists(self._file(k)):
+                os.remove(self._file(k))
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self.keys())
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.json")
+
+
+def _jsonable(x):
+    # Convert NumPy values in nested dictionaries and lists to Python values.
+    if isinstance(x, dict):
+        return {k: _jsonable(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple, np.ndarray)):
+        return [_jsonable(v) for v in x]
+    return x.item() if isinstance(x, np.generic) else x
@@ -0,0 +1,59 @@
+# Per-dimension comparison bit-planes of a case base. For every dimension k
+# the plane le[k] holds in bit (i, j) whether the value of case i is <= that
+# of case j in the order of k, and the plane ge[k] whether it is >=. The
+# dominance matrix for any choice of directions of the orders and any subset
+# of the dimensions is then an AND over planes, so flipping or dropping a
+# dimension does not require comparing the cases again.
+import os
+
+import numpy as np
+
+from bitmatrix import BitMatrix
+from dominance import BLOCK_PAIRS, dimension_blocks, pack_bits
+
+
+class DimensionPlanes:
+    def __init__(self, dims, le, ge):
+        self.dims = dims
+        self.le = le
+        self.ge = ge
+
+    @classmethod
+    def from_store(cls, store, path=None, block_pairs=BLOCK_PAIRS):
+        """
+        Compute the planes of the dimensions of a CaseStore, kept in memory
+        or, if a path is given, as memory-mapped files in that directory.
+        """
+        planes = {True: [], False: []}
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        for k in range(len(store.dims)):
+            for up, name in [(True, "le"), (False, "ge")]:
+                blocks = dimension_blocks(store.ranks, store.tables, k, up, block_pairs)
+                file = None if path is None else os.path.join(path, f"{name}_{k}.npy")
+                planes[up].append(BitMatrix.from_blocks(len(store), blocks, file))
+        return cls(list(store.dims), planes[True], planes[False])
+
+    def dominance(self, s, flips=(), drop=(), path=None, block_pairs=BLOCK_PAIRS):
+        """
+        Return the dominance matrix (see CaseBase.get_dominance_matrix) as a
+        BitMatrix, for the outcomes s, where the orders of the dimensions in
+        flips are reversed and the dimensions in drop are left out.
+        """
+        n = len(s)
+        up = s == 1
+        keep = [k for k, d in enumerate(self.dims) if d not in drop]
+        fw = [self.ge[k] if self.dims[k] in flips else self.le[k] for k in keep]
+        bw = [self.le[k] if self.dims[k] in flips else self.ge[k] for k in keep]
+        M = BitMatrix.zeros(n, path)
+        ones = pack_bits(np.ones((1, n), dtype=bool))
+        # Every tile holds (about) block_pairs words.
+        size = max(1, block_pairs // M.words.shape[1])
+        for i in range(0, n, size):
+            rows = slice(i, min(i + size, n))
+            words = np.repeat(ones, rows.stop - rows.start, axis=0)
+            for a, b in zip(fw, bw):
+                words &= np.where(up[rows, None], a.words[rows], b.words[rows])
+            M.words[rows] = words
+        M.flush()
+        return M
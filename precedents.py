@@ -1,6 +1,17 @@
+import os
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import pandas as pd
 from tqdm import tqdm
 from joblib import Parallel, delayed
+from scipy.stats import norm
+
+from case_base import FactSituation
+from dominance import le_against, le_rows, pack_bits, popcount
 
 
 def determine_distribution(n_precedents):
@@ -12,19 +23,25 @@ def determine_distribution(n_precedents):
 
 def _process_single_case(case, CB):
     """Process a single case to get precedent statistics."""
-    best_precedents = get_best_precedents(case, CB)
-    n_prec = len(best_precedents)
+    # The statistics only need the flags of the best precedents, so these are
+    # taken from the comparisons without building a dictionary per precedent.
+    comparisons = get_comparisons(case, CB)
+    use_alpha = CB.auth_method != "default"
+    best = get_minimal_differences(
+        comparisons.rel, comparisons.alphas if use_alpha else None
+    )
+    n_prec = int(best.sum())
 
     # Determine if non-trivial
-    is_nontrivial = not has_trivial_winning_strategy(best_precedents)
+    is_nontrivial = not comparisons.trivial[best].any()
 
     # Count strategy types
     strategy_counts = {"all": 0, "some": 0, "none": 0, "trivial": 0}
-    if not has_trivial_winning_strategy(best_precedents):
-        n_empties = sum(1 for p in best_precedents if p["requires_empty"])
+    if is_nontrivial:
+        n_empties = int(comparisons.requires_empty[best].sum())
         if n_empties == 0:
             strategy_counts["none"] = 1
-        elif n_empties == len(best_precedents):
+        elif n_empties == n_prec:
             strategy_counts["all"] = 1
         else:
             strategy_counts["some"] = 1
@@ -34,21 +51,401 @@ def _process_single_case(case, CB):
     return n_prec, is_nontrivial, strategy_counts
 
 
-def get_precedent_distribution(CB, n_jobs=-1):
+def get_precedent_distribution(
+    CB, n_jobs=-1, shared=True, chunk_size=None, precision=None, time_budget=None
+):
     """
     Compute precedent distribution with optional parallel processing.
 
     Args:
         CB: Case base
         n_jobs: Number of parallel jobs (-1 = use all cores, 1 = no parallelisation)
+        shared: Whether to publish the arrays of the case base once as
+            memory-mapped files to a pool of workers (see
+            shared_precedent_distribution), instead of sending every case
+            together with the case base to the workers.
+        chunk_size: The number of cases per task if 'shared' is set.
+        precision, time_budget: If either is given, the distribution is
+            estimated from a sample of the cases up to that precision or
+            within that number of seconds (see estimate_precedent_distribution).
     """
-    # Process all cases in parallel
-    case_results = Parallel(n_jobs=n_jobs, backend="loky")(
-        delayed(_process_single_case)(case, CB)
-        for case in tqdm(CB, desc="Computing precedent distribution")
+    if precision is not None or time_budget is not None:
+        return estimate_precedent_distribution(
+            CB, precision or 0, time_budget, n_jobs=n_jobs
+        )
+    if getattr(CB, "dedup", False):
+        return unique_precedent_distribution(CB)
+    if shared:
+        return shared_precedent_distribution(CB, n_jobs, chunk_size)
+
+    # The trivial cases are counted at once, the others are processed in parallel.
+    alphas = CB.store.alphas if CB.auth_method != "default" else None
+    n_zero, _, done = trivial_cases(CB, [alphas])
+    trivial = {"all": 0, "some": 0, "none": 0, "trivial": 1}
+    case_results = [(int(n_zero[k]), False, trivial) for k in np.flatnonzero(done[0])]
+    case_results += Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(_process_single_case)(CB[k], CB)
+        for k in tqdm(np.flatnonzero(~done[0]), desc="Computing precedent distribution")
     )
 
-    # Aggregate results
+    return aggregate_case_results(case_results)
+
+
+def trivial_cases(CB, alphas):
+    """
+    Find the cases whose best precedents are exactly their precedents without
+    relevant differences, in one pass over the dominance matrix (see
+    CaseBase.get_precedent_counts). Returns an array holding the number of
+    such precedents of every case and, for every array of alphas in 'alphas'
+    (None for the default auth method), an array holding the highest alpha
+    of these precedents and a boolean array holding which cases have no
+    other case with the same outcome and a higher alpha. The cases with such
+    precedents have a trivial winning strategy, and only the precedents with
+    a higher alpha remain to be compared, if any.
+    """
+    n = len(CB)
+    alphas = [np.zeros(n) if a is None else np.asarray(a, float) for a in alphas]
+    n_zero = np.zeros(n, dtype=np.int64)
+    tops = np.full((len(alphas), n), -np.inf)
+    done = np.zeros((len(alphas), n), dtype=bool)
+
+    # A precedent is any other case with the same outcome and another name.
+    if len(pd.unique(CB.store.names)) < n:
+        return n_zero, tops, done
+    n_zero, tops = CB.get_precedent_counts(alphas)
+    for p, a in enumerate(alphas):
+        done[p] = (n_zero > 0) & (tops[p] >= _others_max(a, CB.store.outcomes))
+    return n_zero, tops, done
+
+
+def _others_max(values, s):
+    # For every case, the highest of the values of the other cases with the
+    # same outcome, or -inf if there are none.
+    result = np.full(len(values), -np.inf)
+    for o in np.unique(s):
+        rows = np.flatnonzero(s == o)
+        if len(rows) > 1:
+            order = np.argsort(values[rows], kind="stable")
+            result[rows] = values[rows[order[-1]]]
+            result[rows[order[-1]]] = values[rows[order[-2]]]
+    return result
+
+
+# The arrays of the case base attached to a worker process.
+_shared = {}
+
+
+def shared_precedent_distribution(CB, n_jobs=-1, chunk_size=None):
+    """
+    Compute the precedent distribution with a pool of worker processes that
+    attach to the rank matrix, relation tables, outcomes, names and alphas of
+    the case base, which are written once to memory-mapped .npy files. Every
+    task is a chunk of case indices and returns the aggregates of that chunk.
+    """
+    alphas = CB.store.alphas if CB.auth_method != "default" else None
+    return shared_precedent_distributions(CB, [alphas], n_jobs, chunk_size)[0]
+
+
+def shared_precedent_distributions(CB, alphas, n_jobs=-1, chunk_size=None):
+    """
+    Compute the precedent distribution of the case base for every array of
+    alphas in the list 'alphas', where None stands for the default auth
+    method, see shared_precedent_distribution. The differences between the
+    cases are determined once, after which only the best precedents are
+    determined for every array of alphas.
+    """
+    n = len(CB)
+    n_jobs = _n_workers(n_jobs)
+    if chunk_size is None:
+        chunk_size = max(1, -(-n // (4 * n_jobs)))
+    chunks = [np.arange(i, min(i + chunk_size, n)) for i in range(0, n, chunk_size)]
+    chunk_results = list(
+        tqdm(
+            _run_chunks(CB, alphas, chunks, n_jobs),
+            total=len(chunks),
+            desc="Computing precedent distribution",
+        )
+    )
+    return [
+        aggregate_chunk_results([c[p] for c in chunk_results])
+        for p in range(len(alphas))
+    ]
+
+
+# The minimum number of cases, and of non-trivial cases, sampled before the
+# estimates are trusted.
+MIN_SAMPLES = 30
+
+
+def estimate_precedent_distribution(
+    CB,
+    precision=0.01,
+    time_budget=None,
+    confidence=0.95,
+    batch_size=64,
+    n_jobs=1,
+    seed=0,
+):
+    """
+    Estimate the precedent distribution from a random sample of the cases.
+    The cases are processed in random order in batches, and after every batch
+    the statistics are estimated together with the half-widths of their
+    confidence intervals (by the central limit theorem, with the finite
+    population correction). Sampling stops as soon as at least MIN_SAMPLES
+    cases and MIN_SAMPLES non-trivial cases are sampled and the half-widths
+    of both means are at most 'precision', when 'time_budget' seconds have
+    passed, or when all cases are processed, in which case the results are
+    exact.
+
+    Returns the same dictionary as get_precedent_distribution, where the
+    counts are estimated for the whole case base, together with the keys
+    'mean_error', 'mean_nontrivial_error', 'all_error', 'some_error',
+    'none_error' and 'trivial_error' holding the half-widths, 'n_sampled' and
+    'n_nontrivial_sampled'.
+    """
+    start = time.monotonic()
+    n = len(CB)
+    alphas = CB.store.alphas if CB.auth_method != "default" else None
+    order = np.random.default_rng(seed).permutation(n)
+    batches = [order[i : i + batch_size] for i in range(0, n, batch_size)]
+    z = norm.ppf((1 + confidence) / 2)
+    chunk_results = []
+    results = estimate_from_chunk_results(chunk_results, n, z)
+    # The pre-pass costs as much as the dominance matrix, so it is only used
+    # if that is computed already.
+    prepass = CB._dominance is not None or CB._bits is not None
+    runs = _run_chunks(CB, [alphas], batches, _n_workers(n_jobs), prepass)
+    with tqdm(total=n, desc="Estimating precedent distribution") as progress:
+        for chunk_result in runs:
+            chunk_results.append(chunk_result[0])
+            progress.update(len(chunk_result[0][0]))
+            results = estimate_from_chunk_results(chunk_results, n, z)
+            errors = [results["mean_error"], results["mean_nontrivial_error"]]
+            if (
+                results["n_sampled"] >= min(n, MIN_SAMPLES)
+                and results["n_nontrivial_sampled"] >= MIN_SAMPLES
+                and all(e <= precision for e in errors)
+            ):
+                break
+            if time_budget is not None and time.monotonic() - start > time_budget:
+                break
+    runs.close()
+    return results
+
+
+def estimate_from_chunk_results(chunk_results, n, z):
+    """
+    Estimate the distribution of a case base of n cases from the results of
+    _process_cases for a random sample of its cases, see
+    estimate_precedent_distribution.
+    """
+    n_prec = np.concatenate([c[0] for c in chunk_results] + [np.zeros(0, int)])
+    nontrivial = np.concatenate([c[1] for c in chunk_results] + [np.zeros(0, bool)])
+    m = len(n_prec)
+    results = aggregate_chunk_results(chunk_results) if m > 0 else {}
+
+    def error(values):
+        # The half-width of the confidence interval of the mean of values.
+        if len(values) < 2:
+            return None
+        fpc = (n - m) / (n - 1) if n > 1 else 0
+        return z * values.std(ddof=1) * np.sqrt(fpc / len(values))
+
+    for key, values in [("mean", n_prec), ("mean_nontrivial", n_prec[nontrivial])]:
+        results[f"{key}_error"] = error(values)
+    for key in ["all", "some", "none", "trivial"]:
+        count = results.get(key, 0)
+        results[key] = round(count * n / m) if m > 0 else None
+        e = error((np.arange(m) < count).astype(float))
+        results[f"{key}_error"] = None if e is None else round(e * n)
+    results["n_sampled"] = m
+    results["n_nontrivial_sampled"] = int(nontrivial.sum())
+    return results
+
+
+def _n_workers(n_jobs):
+    return os.cpu_count() + 1 + n_jobs if n_jobs < 0 else n_jobs
+
+
+def _run_chunks(CB, alphas, chunks, n_jobs, prepass=True):
+    # Yield the results of _process_cases for every chunk of case indices, in
+    # order, computed by n_jobs worker processes that attach to the arrays of
+    # the case base (or in this process if n_jobs is 1). At most 2 * n_jobs
+    # chunks are submitted ahead, so that the generator can be closed early.
+    # With prepass, the trivial cases are found first (see trivial_cases).
+    store = CB.store
+    n = len(CB)
+    if prepass:
+        n_zero, tops, done = trivial_cases(CB, alphas)
+    else:
+        n_zero = np.zeros(n, dtype=np.int64)
+        tops = np.full((len(alphas), n), -np.inf)
+        done = np.zeros((len(alphas), n), dtype=bool)
+    arrays = {
+        "ranks": store.ranks,
+        "outcomes": store.outcomes,
+        "names": pd.factorize(store.names)[0],
+        "alphas": np.array(
+            [np.zeros(n) if a is None else np.asarray(a, float) for a in alphas]
+        ).reshape(len(alphas), n),
+        "n_zero": n_zero,
+        "tops": tops,
+        "done": done,
+    }
+    for k, table in enumerate(store.tables):
+        if table is not None:
+            arrays[f"table_{k}"] = table
+
+    if n_jobs == 1:
+        _shared.update(arrays)
+        _shared["tables"] = list(store.tables)
+        try:
+            for chunk in chunks:
+                yield _process_cases(chunk)
+        finally:
+            _shared.clear()
+        return
+
+    with tempfile.TemporaryDirectory() as path:
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(array))
+        pool = ProcessPoolExecutor(
+            n_jobs, initializer=_attach, initargs=(path, len(store.tables))
+        )
+        try:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_process_cases, chunk))
+                if len(pending) >= 2 * n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+
+def _attach(path, n_tables):
+    # Initialize a worker by memory-mapping the arrays of the case base.
+    for file in os.listdir(path):
+        _shared[file[:-4]] = np.load(os.path.join(path, file), mmap_mode="r")
+    _shared["tables"] = [_shared.get(f"table_{k}") for k in range(n_tables)]
+
+
+def _process_cases(cases):
+    # For every array of alphas: the number of best precedents of the given
+    # cases, whether they have no trivial winning strategy, and the counts of
+    # the strategies.
+    ranks, tables, s, names, alphas = (
+        _shared[k] for k in ["ranks", "tables", "outcomes", "names", "alphas"]
+    )
+    n_zero, tops, done = _shared["n_zero"], _shared["tops"], _shared["done"]
+    n_prec = np.zeros((len(alphas), len(cases)), dtype=np.int64)
+    nontrivial = np.zeros((len(alphas), len(cases)), dtype=bool)
+    counts = [{"all": 0, "some": 0, "none": 0, "trivial": 0} for _ in alphas]
+    for c, k in enumerate(cases):
+        # The best precedents of a trivial case found by the pre-pass are its
+        # precedents without relevant differences, and the best of those with
+        # a higher alpha, which are the only ones compared.
+        if n_zero[k] > 0:
+            n_prec[:, c] = n_zero[k]
+            for p in range(len(alphas)):
+                counts[p]["trivial"] += 1
+            if done[:, k].all():
+                continue
+            rows = np.flatnonzero((s == s[k]) & (names != names[k]))
+            high = alphas[:, rows] > tops[:, k, None]
+            rows, high = rows[high.any(axis=0)], high[:, high.any(axis=0)]
+            rel = pack_bits(~le_rows(ranks, tables, rows, k, s[k] == 1))
+            for p in np.flatnonzero(high.any(axis=1)):
+                h = high[p]
+                n_prec[p, c] += _skyline(rel[h], alphas[p, rows[h]]).sum()
+            continue
+        rows = np.flatnonzero((s == s[k]) & (names != names[k]))
+        le = le_rows(ranks, tables, rows, k, s[k] == 1)
+        rel = pack_bits(~le)
+        for p in range(len(alphas)):
+            best = get_minimal_differences(rel, alphas[p, rows])
+            n_rel = (~le[best]).sum(axis=1)
+            n_comp = le[best].sum(axis=1)
+            n_empties = ((n_rel > 0) & (n_comp == 0)).sum()
+            n_prec[p, c] = best.sum()
+            nontrivial[p, c] = not (n_rel == 0).any()
+            if not nontrivial[p, c]:
+                counts[p]["trivial"] += 1
+            elif n_empties == 0:
+                counts[p]["none"] += 1
+            elif n_empties == n_prec[p, c]:
+                counts[p]["all"] += 1
+            else:
+                counts[p]["some"] += 1
+    return list(zip(n_prec, nontrivial, counts))
+
+
+def unique_precedent_distribution(CB):
+    """
+    Compute the precedent distribution using the unique fact situations of
+    the case base (see unique.py). All cases with the same fact situation and
+    outcome have the same best precedents, and the precedents with the same
+    fact situation have the same differences and alpha, so the skyline is
+    computed once per group, where every precedent counts with the number of
+    cases it stands for.
+    """
+    unique = CB.get_unique()
+    alphas = unique.per_unique(CB.get_alphas()) if CB.auth_method != "default" else None
+    n_prec = np.zeros(unique.w.shape, dtype=np.int64)
+    nontrivial = np.zeros(unique.w.shape, dtype=bool)
+    strategy = np.zeros(unique.w.shape, dtype=np.int64)
+    strategies = ["trivial", "none", "all", "some"]
+    for o, u in zip(*np.nonzero(unique.w)):
+        # The other cases with the same outcome, grouped by fact situation.
+        weights = unique.w[o] - (np.arange(len(unique)) == u)
+        rows = np.flatnonzero(weights > 0)
+        le = le_rows(unique.ranks, unique.tables, rows, u, o == 1)
+        best = get_minimal_differences(
+            pack_bits(~le), None if alphas is None else alphas[o, rows]
+        )
+        n_rel = (~le[best]).sum(axis=1)
+        n_comp = le[best].sum(axis=1)
+        w = weights[rows][best]
+        n_prec[o, u] = w.sum()
+        n_empties = w[(n_rel > 0) & (n_comp == 0)].sum()
+        nontrivial[o, u] = not (n_rel == 0).any()
+        if not nontrivial[o, u]:
+            strategy[o, u] = 0
+        elif n_empties == 0:
+            strategy[o, u] = 1
+        elif n_empties == n_prec[o, u]:
+            strategy[o, u] = 2
+        else:
+            strategy[o, u] = 3
+
+    # Expand the results to the individual cases.
+    strategy = np.bincount(unique.expand(strategy), minlength=len(strategies))
+    counts = {"all": 0, "some": 0, "none": 0, "trivial": 0}
+    counts.update({k: int(c) for k, c in zip(strategies, strategy)})
+    return aggregate_chunk_results(
+        [(unique.expand(n_prec), unique.expand(nontrivial), counts)]
+    )
+
+
+def aggregate_chunk_results(chunk_results):
+    """Aggregate the results of _process_cases into the distribution."""
+    results = {"all": 0, "some": 0, "none": 0, "trivial": 0}
+    for _, _, counts in chunk_results:
+        for key in counts:
+            results[key] += counts[key]
+    n_prec = np.concatenate([c[0] for c in chunk_results] + [np.zeros(0, int)])
+    nontrivial = np.concatenate([c[1] for c in chunk_results] + [np.zeros(0, bool)])
+    results["mean"], results["std"] = determine_distribution(n_prec)
+    if nontrivial.any():
+        results["mean_nontrivial"], _ = determine_distribution(n_prec[nontrivial])
+    else:
+        results["mean_nontrivial"] = None
+    return results
+
+
+def aggregate_case_results(case_results):
+    """Aggregate the results of _process_single_case into the distribution."""
     n_precedents = []
     n_precedents_nontrivial = []
     results = {"all": 0, "some": 0, "none": 0, "trivial": 0}
@@ -72,6 +469,102 @@ def get_precedent_distribution(CB, n_jobs=-1):
     return results
 
 
+class PrecedentStatistics:
+    """
+    Running precedent statistics for a case base to which cases are added (or
+    from which they are removed) one at a time. For every case, the distinct
+    relevant differences of its best precedents are kept as integer bitmasks
+    together with their number of precedents, and are updated by comparing
+    with the changed case only.
+
+    Under an auth_method other than "default" every alpha changes when a case
+    is added or removed, so the statistics are then recomputed by results.
+    """
+
+    def __init__(self, CB):
+        self.full = (1 << len(CB.store.dims)) - 1
+        self.best = {}
+        self.dirty = set()
+        if CB.auth_method == "default":
+            for k in range(len(CB)):
+                self.best[CB[k].name] = self._best(CB, k)
+
+    def add(self, CB, k):
+        """Update the statistics after the case at index k was added to CB."""
+        if CB.auth_method != "default":
+            return
+        name = CB[k].name
+        self.best[name] = self._best(CB, k)
+        for other, m in self._masks(CB, k):
+            best = self.best[other]
+            if other in self.dirty:
+                continue
+            if m in best:
+                best[m] += 1
+            elif not any(b & ~m == 0 for b in best):
+                for b in [b for b in best if m & ~b == 0]:
+                    del best[b]
+                best[m] = 1
+
+    def remove(self, CB, k):
+        """Update the statistics before the case at index k is removed from CB."""
+        if CB.auth_method != "default":
+            return
+        name = CB[k].name
+        del self.best[name]
+        self.dirty.discard(name)
+        for other, m in self._masks(CB, k):
+            best = self.best[other]
+            if other not in self.dirty and m in best:
+                best[m] -= 1
+                if best[m] == 0:
+                    self.dirty.add(other)
+
+    def results(self, CB):
+        """Return the same statistics as get_precedent_distribution."""
+        if CB.auth_method != "default":
+            return get_precedent_distribution(CB)
+        for k, name in enumerate(CB.store.names):
+            if name in self.dirty:
+                self.best[name] = self._best(CB, k)
+        self.dirty = set()
+
+        case_results = []
+        for name in CB.store.names:
+            best = self.best[name]
+            strategy_counts = {"all": 0, "some": 0, "none": 0, "trivial": 0}
+            n_prec = sum(best.values())
+            n_empties = best.get(self.full, 0)
+            if 0 in best:
+                strategy_counts["trivial"] = 1
+            elif n_empties == 0:
+                strategy_counts["none"] = 1
+            elif n_empties == n_prec:
+                strategy_counts["all"] = 1
+            else:
+                strategy_counts["some"] = 1
+            case_results.append((n_prec, 0 not in best, strategy_counts))
+        return aggregate_case_results(case_results)
+
+    def _best(self, CB, k):
+        # The relevant differences of the best precedents for case k.
+        comparisons = get_comparisons(CB[k], CB)
+        if not comparisons:
+            return {}
+        rel = comparisons.rel[get_minimal_differences(comparisons.rel)]
+        return dict(Counter(int.from_bytes(r.tobytes(), "little") for r in rel))
+
+    def _masks(self, CB, k):
+        # The relevant differences of case k as a precedent for the other
+        # cases with the same outcome.
+        store = CB.store
+        s = store.outcomes[k]
+        rows = np.flatnonzero((store.outcomes == s) & (store.names != store.names[k]))
+        le = le_against(store.ranks, store.tables, k, rows, s == 1)
+        masks = (int.from_bytes(r.tobytes(), "little") for r in pack_bits(~le))
+        return zip(store.names[rows], masks)
+
+
 def determine_strategy_counts(results, best_precedents):
     if not has_trivial_winning_strategy(best_precedents):
         n_empties = len([p for p in best_precedents if p["requires_empty"] is True])
@@ -96,29 +589,102 @@ def get_best_precedents(f, CB):
     if not comparisons:
         return []
 
-    # Pre-compute trivial/requires_empty for all comparisons
-    for c in comparisons:
-        c["trivial"], c["requires_empty"] = determine_trivial_or_requires_empty(c)
-
-    bested = set()
     use_alpha = CB.auth_method != "default"
+    best = get_minimal_differences(
+        comparisons.rel, comparisons.alphas if use_alpha else None
+    )
+    return [comparisons[k] for k in np.flatnonzero(best)]
 
-    for c in comparisons:
-        if c["name"] in bested:
-            continue
 
-        c_diffs = c["rel_differences"]
-        for oc in comparisons:
-            if oc["name"] == c["name"] or oc["name"] in bested:
-                continue
+def get_minimal_differences(rel, alphas=None):
+    """
+    Determine which precedents are not bested by another, where a precedent is
+    bested if the relevant differences of another form a strict subset of its
+    own (and, if alphas are given, that other has at least the same alpha).
+
+    This is a skyline computation: the distinct sets of differences are
+    visited in order of cardinality and only compared with the minimal sets
+    found so far, since any precedent bested by some other precedent is also
+    bested by a precedent that is itself not bested.
 
-            # Check if c is worse than oc
-            if c_diffs > oc["rel_differences"]:
-                if not use_alpha or c["alpha"] <= oc["alpha"]:
-                    bested.add(c["name"])
-                    break  # Early termination - c is already bested
+    Most cases have precedents without relevant differences, i.e. a trivial
+    winning strategy. These precedents are never bested and best all others,
+    except those with a higher alpha, so only those remain to be compared.
 
-    return [c for c in comparisons if c["name"] not in bested]
+    Args:
+        rel: The relevant differences as rows of packed bitmasks.
+        alphas: The alphas of the precedents, or None.
+    """
+    zero = ~rel.any(axis=1)
+    if zero.any():
+        best = zero.copy()
+        if alphas is not None:
+            alphas = np.asarray(alphas, float)
+            rest = ~zero & (alphas > alphas[zero].max())
+            if rest.any():
+                best[rest] = _skyline(rel[rest], alphas[rest])
+        return best
+    return _skyline(rel, alphas)
+
+
+def _skyline(rel, alphas=None):
+    # The skyline computation of get_minimal_differences.
+    alphas = np.zeros(len(rel)) if alphas is None else np.asarray(alphas, float)
+    uniq, inverse = np.unique(rel, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    sizes = popcount(uniq)
+
+    # For every distinct set of differences, the highest alpha of a precedent
+    # with a strict subset of it that is not bested, and the highest alpha of
+    # a precedent with exactly those differences that is not bested.
+    bound = np.full(len(uniq), -np.inf)
+    top = np.full(len(uniq), -np.inf)
+
+    # The bound of a set of differences only matters up to the lowest alpha
+    # of a precedent with those differences.
+    floor = np.full(len(uniq), np.inf)
+    np.minimum.at(floor, inverse, alphas)
+
+    by_size = np.argsort(sizes[inverse], kind="stable")
+    levels = np.split(by_size, np.flatnonzero(np.diff(sizes[inverse][by_size])) + 1)
+    for elements in levels:
+        level = np.unique(inverse[elements])
+        minimal = np.flatnonzero(top > -np.inf)
+        if len(minimal):
+            bound[level] = _max_over_subsets(
+                uniq[level], uniq[minimal], top[minimal], floor[level]
+            )
+        survivors = elements[alphas[elements] > bound[inverse[elements]]]
+        np.maximum.at(top, inverse[survivors], alphas[survivors])
+
+    return alphas > bound[inverse]
+
+
+def _max_over_subsets(masks, subsets, values, floor, block_pairs=1 << 18):
+    # For every mask, the maximum of the values of the subsets contained in
+    # it, where only maxima of at least 'floor' (per mask) matter, and -inf
+    # is returned otherwise. The subsets are visited in order of decreasing
+    # value, so a mask is done at the first subset contained in it, or as soon
+    # as the values drop below its floor.
+    result = np.full(len(masks), -np.inf)
+    order = np.argsort(-values, kind="stable")
+    subsets, values = subsets[order], values[order]
+    remaining = np.arange(len(masks))
+    i = 0
+    while i < len(subsets):
+        remaining = remaining[floor[remaining] <= values[i]]
+        if len(remaining) == 0:
+            break
+        size = max(1, block_pairs // len(remaining))
+        chunk = subsets[i : i + size]
+        block = masks[remaining]
+        contained = ((chunk[None, :, :] & ~block[:, None, :]) == 0).all(axis=2)
+        found = contained.any(axis=1)
+        first = contained[found].argmax(axis=1)
+        result[remaining[found]] = values[i : i + size][first]
+        remaining = remaining[~found]
+        i += size
+    return result
 
 
 def determine_trivial_or_requires_empty(c):
@@ -130,28 +696,71 @@ def determine_trivial_or_requires_empty(c):
         return False, False
 
 
+class Comparisons:
+    """
+    The comparisons of a fact situation with a number of precedents. The
+    relevant and compensating differences are stored as bitmasks over the
+    dimensions, packed into rows of 64-bit words. Indexing or iterating
+    yields the comparisons as dictionaries holding the sets of differences,
+    which are only built at that moment.
+    """
+
+    def __init__(self, dims, names, rel, comp, alphas=None):
+        self.dims = dims
+        self.names = names
+        self.rel = rel
+        self.comp = comp
+        self.alphas = alphas
+        n_rel = popcount(rel)
+        n_comp = popcount(comp)
+        self.trivial = n_rel == 0
+        self.requires_empty = (n_rel > 0) & (n_comp == 0)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return (self[k] for k in range(len(self)))
+
+    def __getitem__(self, k):
+        c = {
+            "name": self.names[k],
+            "rel_differences": self._to_set(self.rel[k]),
+            "comp_differences": self._to_set(self.comp[k]),
+        }
+        if self.alphas is not None:
+            c["alpha"] = self.alphas[k]
+        c["trivial"] = bool(self.trivial[k])
+        c["requires_empty"] = bool(self.requires_empty[k])
+        return c
+
+    def _to_set(self, words):
+        bits = np.unpackbits(words.view(np.uint8), bitorder="little")
+        return {self.dims[k] for k in np.flatnonzero(bits[: len(self.dims)])}
+
+
 def get_comparisons(f, CB):
-    if CB.auth_method == "default":
-        return [
-            {
-                "name": c.name,
-                "rel_differences": set(c.diff(f.F)),
-                "comp_differences": set(c.comp_diff(f.F)),
-            }
-            for c in CB
-            if c.s == f.s and c.name != f.name
-        ]
+    store = CB.store
+    rows = np.flatnonzero((store.outcomes == f.s) & (store.names != f.name))
+
+    # Compare using the rank matrix if f is stored in the case base itself,
+    # and using the coordinates of the dimensions otherwise.
+    F = f.F
+    if isinstance(F, FactSituation) and F.store is store:
+        le = le_rows(store.ranks, store.tables, rows, F.row, f.s == 1)
     else:
-        return [
-            {
-                "name": c.name,
-                "rel_differences": set(c.diff(f.F)),
-                "comp_differences": set(c.comp_diff(f.F)),
-                "alpha": c.alpha,
-            }
-            for c in CB
-            if c.s == f.s and c.name != f.name
-        ]
+        comp = [set(CB[i].comp_diff(F)) for i in rows]
+        le = np.array([[d in c for d in store.dims] for c in comp], dtype=bool).reshape(
+            len(rows), len(store.dims)
+        )
+
+    return Comparisons(
+        store.dims,
+        store.names[rows],
+        pack_bits(~le),
+        pack_bits(le),
+        store.alphas[rows] if CB.auth_method != "default" else None,
+    )
 
 
 def inner_loop_naive(comparisons, c, bested):
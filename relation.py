@@ -0,0 +1,102 @@
+# A sparse representation of a relation between the cases of a case base,
+# such as the forcings or the inconsistent forcings. The pairs (i, j) are
+# stored in compressed sparse row (CSR) format: the cases j related to case i
+# are indices[indptr[i] : indptr[i + 1]], in increasing order.
+import numpy as np
+import scipy.sparse as sp
+
+
+class Relation:
+    def __init__(self, indptr, indices, n):
+        self.indptr = indptr
+        self.indices = indices
+        self.n = n
+
+    @classmethod
+    def from_pairs(cls, n, I, J):
+        """Create the relation holding the pairs (I[k], J[k]) on n cases."""
+        keys = np.unique(np.asarray(I, dtype=np.int64) * n + np.asarray(J, np.int64))
+        I, J = keys // n, keys % n
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(I, minlength=n))])
+        return cls(indptr, J, n)
+
+    @classmethod
+    def from_blocks(cls, n, blocks):
+        """
+        Create the relation on n cases from pairs (rows, block), where
+        block[a, b] holds iff (rows[a], b) is in the relation, such as those
+        yielded by dominance.dominance_blocks. Only the pairs in a block are
+        kept, so the dense matrix is never needed at once.
+        """
+        counts = np.zeros(n, dtype=np.int64)
+        parts = []
+        for rows, block in blocks:
+            r, c = np.nonzero(block)
+            counts[rows] = np.bincount(r, minlength=len(rows))
+            parts.append((rows[r], c.astype(np.int64)))
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        indices = np.zeros(indptr[-1], dtype=np.int64)
+        for I, J in parts:
+            # Every row is contained in a single block, in which its pairs are
+            # ordered by column, so they can be placed at the start of the row.
+            start = indptr[I]
+            offset = np.arange(len(I)) - np.searchsorted(I, I, side="left")
+            indices[start + offset] = J
+        return cls(indptr, indices, n)
+
+    @classmethod
+    def from_sets(cls, Id, n=None):
+        """Create the relation from a dictionary mapping cases to sets of cases."""
+        n = (
+            max(list(Id) + [j for i in Id for j in Id[i]], default=-1) + 1
+            if n is None
+            else n
+        )
+        I = [i for i in Id for _ in Id[i]]
+        J = [j for i in Id for j in Id[i]]
+        return cls.from_pairs(n, I, J)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        return zip(*(a.tolist() for a in self.pairs()))
+
+    def __contains__(self, pair):
+        i, j = pair
+        row = self[i]
+        k = np.searchsorted(row, j)
+        return k < len(row) and row[k] == j
+
+    def __getitem__(self, i):
+        return self.indices[self.indptr[i] : self.indptr[i + 1]]
+
+    def pairs(self):
+        """Return the pairs as two arrays I and J."""
+        return np.repeat(np.arange(self.n), self.degrees()), self.indices
+
+    def degrees(self):
+        """Return the number of cases every case is related to."""
+        return np.diff(self.indptr)
+
+    def filter(self, keep):
+        """Return the relation holding the pairs k for which keep[k] holds."""
+        I, J = self.pairs()
+        counts = np.bincount(I[keep], minlength=self.n)
+        return Relation(np.concatenate([[0], np.cumsum(counts)]), J[keep], self.n)
+
+    def transpose(self):
+        I, J = self.pairs()
+        return Relation.from_pairs(self.n, J, I)
+
+    def symmetric(self):
+        """Return the smallest symmetric relation containing this relation."""
+        I, J = self.pairs()
+        return Relation.from_pairs(
+            self.n, np.concatenate([I, J]), np.concatenate([J, I])
+        )
+
+    def to_scipy(self):
+        """Return the relation as a boolean scipy.sparse.csr_matrix."""
+        data = np.ones(len(self.indices), dtype=bool)
+        return sp.csr_matrix((data, self.indices, self.indptr), shape=(self.n, self.n))
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from case_base import CaseBase, artifact_key
+from precedents import get_precedent_distribution
+
+
+def test_save_load(csv_file, tmp_path):
+    df = pd.read_csv(csv_file)
+    df["Kind"] = ["a", "b", "a", "c", "b", "c", "a"]
+    CB = CaseBase(df, auth_method="harmonic_1")
+    CB.save(tmp_path / "cb", "key")
+    loaded = CaseBase.load(tmp_path / "cb", "key")
+    assert isinstance(loaded.store.ranks, np.memmap)
+    assert [c.name for c in loaded] == [c.name for c in CB]
+    assert pd.Series(loaded.coeffs).equals(pd.Series(CB.coeffs))
+    assert (loaded.get_alphas() == CB.get_alphas()).all()
+    assert (loaded.get_dominance_matrix() == CB.get_dominance_matrix()).all()
+    assert loaded[1]["Kind"] == "b" and loaded[1]["Kind"] <= CB[1]["Kind"]
+    assert get_precedent_distribution(loaded, 1) == get_precedent_distribution(CB, 1)
+    with pytest.raises(ValueError):
+        CaseBase.load(tmp_path / "cb", "other")
+
+
+def test_from_csv(csv_file, tmp_path):
+    key = artifact_key(csv_file, auth_method="relative")
+    assert key != artifact_key(csv_file, auth_method="absolute")
+    CB = CaseBase.from_csv(csv_file, tmp_path / "cb", auth_method="relative")
+    loaded = CaseBase.from_csv(csv_file, tmp_path / "cb", auth_method="relative")
+    assert isinstance(loaded.store.alphas, np.memmap)
+    assert (loaded.get_alphas() == CB.get_alphas()).all()
+    loaded.add_case({"Gift": 1, "Present": 1, "Website": 1, "High-cost": 0}, 0)
+    assert len(loaded) == 8 and len(CaseBase.load(tmp_path / "cb")) == 7
@@ -1,10 +1,19 @@
+import numpy as np
 import pandas as pd
 
-from authoritativeness import (absolute_authoritativeness,
+import pytest
+
+from authoritativeness import (absolute_authoritativeness, alpha,
                                harmonic_authoritativeness,
                                product_authoritativeness,
                                relative_authoritativeness)
 from case_base import CaseBase
+from dominance import dominance_counts, outcome_counts
+from experiments.authoritativeness import (
+    evaluate_auth_methods,
+    evaluate_betas,
+    evaluate_dataset,
+)
 
 
 def test_absolute_authoritativeness(csv_file):
@@ -33,3 +42,53 @@ def test_harmonic_authoritativeness(csv_file):
     case = CB[0]
     auth = harmonic_authoritativeness(case, CB, beta=1)
     assert auth == 2 * ((6 / 7) * (6 / 7)) / ((6 / 7) + (6 / 7))
+
+
+@pytest.mark.parametrize(
+    "method", ["relative", "absolute", "product", "harmonic_1.0", "harmonic_0.5"]
+)
+def test_calculate_alphas(csv_file, method):
+    CB = CaseBase(pd.read_csv(csv_file), auth_method=method)
+    assert list(CB.get_alphas()) == [alpha(case, CB, method) for case in CB]
+
+
+@pytest.mark.parametrize("make_consistent", [False, True])
+def test_evaluate_auth_methods(csv_file, make_consistent):
+    auth_methods = ["default", "relative", "absolute", "product", "harmonic_1.0"]
+    df = pd.read_csv(csv_file)
+    results = evaluate_auth_methods(CaseBase(df.copy()), auth_methods, make_consistent)
+    for auth_method in auth_methods:
+        expected = evaluate_dataset("", auth_method, make_consistent, df=df.copy())
+        assert results[auth_method] == expected
+
+
+@pytest.mark.parametrize("make_consistent", [False, True])
+def test_evaluate_betas(csv_file, make_consistent):
+    df = pd.read_csv(csv_file)
+    CB = CaseBase(df.copy())
+    betas = [0.25, 1.0, 4.0]
+    results = list(evaluate_betas(CB, betas, make_consistent, batch_size=2))
+    assert [beta for beta, _ in results] == betas
+    for beta, result in results:
+        auth_method = f"harmonic_{beta}"
+        expected = evaluate_dataset("", auth_method, make_consistent, df=df.copy())
+        assert result == expected
+
+
+def test_dominance_counts():
+    rng = np.random.default_rng(0)
+    points = rng.integers(0, 4, (300, 3))
+    weights = rng.integers(0, 3, (300, 2))
+    queries = rng.integers(0, 4, (50, 3))
+    expected = (queries[:, None, :] <= points[None, :, :]).all(axis=2) @ weights
+    assert (dominance_counts(points, weights, queries) == expected).all()
+
+
+def test_outcome_counts_divide_and_conquer(csv_file, monkeypatch):
+    CB = CaseBase(pd.read_csv(csv_file), auth_method="relative")
+    store = CB.store
+    expected = outcome_counts(store.ranks, store.tables, store.outcomes)
+    monkeypatch.setattr("dominance.MIN_DC_CASES", 0)
+    monkeypatch.setattr("dominance.LEAF_PAIRS", 4)
+    counts = outcome_counts(store.ranks, store.tables, store.outcomes)
+    assert all((a == b).all() for a, b in zip(counts, expected))
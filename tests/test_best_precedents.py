@@ -1,8 +1,17 @@
+import numpy as np
 import pandas as pd
 import pytest
 
+import precedents
 from case_base import CaseBase
-from precedents import get_best_precedents
+from dominance import pack_bits
+from precedents import (
+    get_best_precedents,
+    get_comparisons,
+    get_minimal_differences,
+    get_precedent_distribution,
+    trivial_cases,
+)
 
 
 @pytest.fixture()
@@ -45,3 +54,60 @@ def test_find_best_precedents_abs(inconst_csv):
     precedents = get_best_precedents(case, CB)
     assert len(precedents) == 1
     assert precedents[0]["name"] == 2
+
+
+def test_comparisons_match_differences(inconst_csv):
+    CB = CaseBase(pd.read_csv(inconst_csv))
+    case = CB[3]
+    comparisons = get_comparisons(case, CB)
+    assert [c["name"] for c in comparisons] == [0, 2, 4, 5]
+    for c in comparisons:
+        assert c["rel_differences"] == set(CB[c["name"]].diff(case.F))
+        assert c["comp_differences"] == set(CB[c["name"]].comp_diff(case.F))
+        assert c["trivial"] == (len(c["rel_differences"]) == 0)
+
+
+def test_minimal_differences():
+    rel = pack_bits(
+        np.array(
+            [[1, 1, 0], [1, 0, 0], [0, 1, 0], [1, 0, 0], [0, 0, 1], [1, 1, 1]],
+            dtype=bool,
+        )
+    )
+    best = get_minimal_differences(rel)
+    assert list(best) == [False, True, True, True, True, False]
+    best = get_minimal_differences(rel, alphas=[0.9, 0.5, 0.2, 0.5, 0.1, 0.9])
+    assert list(best) == [True, True, True, True, True, False]
+
+
+def test_minimal_differences_trivial():
+    # The first two precedents have no relevant differences.
+    rel = pack_bits(
+        np.array([[0, 0], [0, 0], [1, 0], [0, 1], [1, 1], [1, 0]], dtype=bool)
+    )
+    best = get_minimal_differences(rel)
+    assert list(best) == [True, True, False, False, False, False]
+    best = get_minimal_differences(rel, alphas=[0.2, 0.3, 0.5, 0.1, 0.4, 0.25])
+    assert list(best) == [True, True, True, False, False, False]
+
+
+@pytest.mark.parametrize("auth_method", ["default", "relative"])
+def test_trivial_cases(inconst_csv, monkeypatch, auth_method):
+    CB = CaseBase(pd.read_csv(inconst_csv), auth_method=auth_method)
+    alphas = None if auth_method == "default" else CB.get_alphas()
+    n_zero, tops, done = trivial_cases(CB, [alphas])
+    best = [get_best_precedents(c, CB) for c in CB]
+    assert list(n_zero) == [sum(p["trivial"] for p in b) for b in best]
+    assert list(done[0] & (n_zero > 0)) == list(done[0])
+    assert all(len(b) == n_zero[k] for k, b in enumerate(best) if done[0, k])
+
+    # Only the cases left by the pre-pass are compared with their precedents.
+    expected = get_precedent_distribution(CB, n_jobs=1, shared=False)
+    CB.get_dominance_matrix()
+    calls = []
+    le_rows = precedents.le_rows
+    monkeypatch.setattr(
+        precedents, "le_rows", lambda *args: calls.append(1) or le_rows(*args)
+    )
+    assert get_precedent_distribution(CB, n_jobs=1) == expected
+    assert len(calls) == (~done[0]).sum()
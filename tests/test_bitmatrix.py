@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from bitmatrix import BitMatrix
+from case_base import CaseBase
+
+
+def test_bit_matrix(csv_file, tmp_path):
+    CB = CaseBase(pd.read_csv(csv_file))
+    M = CB.get_dominance_matrix()
+    s = CB.get_outcomes()
+    for path in [None, tmp_path / "dominance.npy"]:
+        B = BitMatrix.from_blocks(len(M), [(np.arange(len(M)), M)], path)
+        assert (B.to_dense() == M).all()
+        assert (B.row_counts() == M.sum(axis=1)).all()
+        assert (B.row_counts(s == 1) == M[:, s == 1].sum(axis=1)).all()
+        assert (B.col_counts(s == 0) == M[s == 0].sum(axis=0)).all()
+        assert B.get(0, 1) == M[0, 1]
+    assert (BitMatrix.open(tmp_path / "dominance.npy").to_dense() == M).all()
+
+
+def test_dominance_bits(csv_file, tmp_path):
+    df = pd.read_csv(csv_file)
+    CB = CaseBase(df, auth_method="relative")
+    inds = range(len(CB))
+    counts = CB.get_agreement_counts()
+    Id = CB.determine_inconsistent_forcings(inds, CB.get_forcings(inds))
+    M = CB.get_dominance_matrix()
+    landmarks = [
+        not any(M[j, i] and c.s == CB[j].s for j in inds if j != i)
+        for i, c in enumerate(CB)
+    ]
+
+    CB = CaseBase(df, auth_method="relative")
+    CB.get_dominance_bits(tmp_path / "dominance.npy")
+    assert all((a == b).all() for a, b in zip(CB.get_agreement_counts(), counts))
+    assert set(CB.get_inconsistent_forcings(inds)) == set(Id)
+    assert CB.get_landmarks().tolist() == landmarks
+    assert CB._dominance is None
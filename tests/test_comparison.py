@@ -2,7 +2,7 @@ import pandas as pd
 import pytest
 
 from authoritativeness import relative_authoritativeness
-from case_base import CaseBase
+from case_base import Case, CaseBase, Dimension, tr_closure
 
 
 @pytest.fixture
@@ -27,3 +27,37 @@ def test_comparison_relative(simple_csv):
     assert (CB[3] <= CB[4]) and not (
         relative_authoritativeness(CB[3], CB) <= relative_authoritativeness(CB[4], CB)
     )
+
+
+def test_comparison_stored_and_standalone_cases(simple_csv):
+    CB = CaseBase(pd.read_csv(simple_csv))
+    standalone = [Case(c.name, dict(c.F), c.s) for c in CB]
+    for a, sa in zip(CB, standalone):
+        for b, sb in zip(CB, standalone):
+            assert (a <= b) == (sa <= sb)
+            assert list(a.diff(b.F)) == list(sa.diff(sb.F))
+            assert list(a.comp_diff(b.F)) == list(sa.comp_diff(sb.F))
+
+
+def test_changed_value_clears_caches(csv_file):
+    CB = CaseBase(pd.read_csv(csv_file))
+    CB.get_dominance_matrix()
+    CB.get_forcings(range(len(CB)))
+    CB[6]["Website"] = 0
+    M = CB.get_dominance_matrix()
+    assert [[M[i, j] for j in range(len(CB))] for i in range(len(CB))] == [
+        [a <= b for b in CB] for a in CB
+    ]
+    assert (6, 0) in CB.get_forcings(range(len(CB)))
+
+
+def test_compiled_set_order():
+    hd = {("a", "b"), ("b", "c"), ("a", "d")}
+    closure = tr_closure(["a", "b", "c", "d"], hd)
+    assert ("a", "c") in closure and ("c", "a") not in closure
+    assert ("b", "d") not in closure and ("d", "d") in closure
+    dims = [Dimension("x", closure), Dimension.from_hasse("x", "abcd", hd)]
+    for dim in dims:
+        assert all(dim.le(x, y) == ((x, y) in closure) for x in "abcde" for y in "abcd")
+        # A value outside the order is only comparable with itself.
+        assert dim.le("e", "e") and not dim.le("e", "a")
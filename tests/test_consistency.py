@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
 import pytest
 
 from case_base import CaseBase
+from consistency import minimum_removals, weighted_removals
+from experiments.authoritativeness import evaluate_case_base
 
 
 def test_make_consistent(csv_file):
@@ -12,6 +15,57 @@ def test_make_consistent(csv_file):
     assert initial_size - reduced_size == 1
 
 
+def test_exact_removals(csv_file):
+    CB = CaseBase(pd.read_csv(csv_file))
+    inds = range(len(CB))
+    Id = CB.determine_inconsistent_forcings(inds, CB.get_forcings(inds))
+    removals = CB.determine_removals(inds, Id, method="exact")
+    assert removals == [5]
+    CB.take_consistent_subset(method="exact")
+    assert [c.name for c in CB] == [0, 1, 2, 3, 4, 6]
+
+
+@pytest.mark.parametrize("index", [range(10, 17), range(6, -1, -1)])
+def test_consistent_subset_by_position(csv_file, index):
+    df = pd.read_csv(csv_file)
+    df.index = index
+    CB = CaseBase(df)
+    report = CB.take_consistent_subset(method="exact")
+    assert report["removed"] == [index[5]]
+    assert [c.name for c in CB] == [index[k] for k in [0, 1, 2, 3, 4, 6]]
+
+
+@pytest.mark.parametrize("dedup", [False, True])
+def test_parallel_removals(csv_file, dedup):
+    df = pd.read_csv(csv_file)
+    CB = CaseBase(df, dedup=dedup, auth_method="relative")
+    expected = evaluate_case_base(CB, removal_method="weighted")
+    results = evaluate_case_base(CB, removal_method="weighted", n_jobs=2)
+    assert results == expected
+    CB = CaseBase(df, dedup=dedup)
+    report = CB.take_consistent_subset(method="exact", n_jobs=2)
+    assert report["removed"] == [5]
+
+
+def test_weighted_removals():
+    # Case 0 conflicts with cases 1 and 2, which are cheaper to remove.
+    Id = {0: {1, 2}, 1: {0}, 2: {0}, 3: set()}
+    s = np.array([1, 0, 0, 1])
+    assert minimum_removals(Id, s) == [0]
+    removed, objective = weighted_removals(Id, s, [0.9, 0.3, 0.4, 0.5])
+    assert removed == [1, 2]
+    assert objective == 0.3 + 0.4
+
+
+def test_weighted_consistent_subset():
+    df = pd.DataFrame({"Col1": [1, 1, 0, 2], "Label": [1, 0, 0, 1]})
+    CB = CaseBase(df, auth_method="relative")
+    report = CB.take_consistent_subset(method="weighted")
+    assert report["removed"] == [0]
+    assert report["N_del"] == 1
+    assert report["objective"] == CaseBase(df, auth_method="relative")[0].alpha
+
+
 @pytest.mark.skip(reason="Slow test")
 def test_make_consistent_mushroom():
     CB = CaseBase(pd.read_csv("data/mushroom.csv"))
@@ -1,7 +1,12 @@
+import numpy as np
 import pandas as pd
 
 from case_base import CaseBase
-from precedents import get_precedent_distribution
+from precedents import (
+    MIN_SAMPLES,
+    estimate_precedent_distribution,
+    get_precedent_distribution,
+)
 
 
 def test_best_precedent_distribution_naive(csv_file):
@@ -16,3 +21,42 @@ def test_best_precedent_distribution_rel(csv_file):
     dict = get_precedent_distribution(CB)
     assert round(dict["mean"], 2) == 3.43
     assert round(dict["std"], 2) == 1.68
+
+
+def test_shared_precedent_distribution(csv_file):
+    for auth_method in ["default", "relative"]:
+        CB = CaseBase(pd.read_csv(csv_file), auth_method=auth_method)
+        expected = get_precedent_distribution(CB, n_jobs=1, shared=False)
+        assert get_precedent_distribution(CB, n_jobs=2, chunk_size=3) == expected
+        assert get_precedent_distribution(CB, n_jobs=1) == expected
+
+
+def test_estimate_precedent_distribution(csv_file):
+    CB = CaseBase(pd.read_csv(csv_file), auth_method="relative")
+    expected = get_precedent_distribution(CB, n_jobs=1)
+
+    # Once all cases are sampled, the estimates are exact.
+    for n_jobs in [1, 2]:
+        results = estimate_precedent_distribution(
+            CB, precision=0, batch_size=2, n_jobs=n_jobs
+        )
+        assert {k: results[k] for k in expected} == expected
+        assert results["n_sampled"] == len(CB)
+        assert results["mean_error"] == 0
+
+    results = estimate_precedent_distribution(CB, 0, time_budget=0, batch_size=1)
+    assert results["n_sampled"] == 1
+    assert results["mean_error"] is None
+
+
+def test_estimate_until_precise():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({d: rng.integers(0, 10, 600) for d in "abcd"})
+    df["Label"] = (df.sum(axis=1) + rng.integers(0, 10, 600) > 22).astype(int)
+    CB = CaseBase(df)
+    for precision in [10, 1]:
+        results = estimate_precedent_distribution(CB, precision, batch_size=8)
+        assert MIN_SAMPLES <= results["n_nontrivial_sampled"]
+        assert results["n_sampled"] < len(CB)
+        assert results["mean_error"] <= precision
+        assert results["mean_nontrivial_error"] <= precision
@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
 import pytest
 
 from case_base import CaseBase
+from dominance import binary_dimensions, dominance_matrix, outcome_counts
+from relation import Relation
 
 
 @pytest.fixture
@@ -44,3 +47,87 @@ def test_number_of_inconsistent_forcing_admission():
     Id = CB.determine_inconsistent_forcings(inds, forcings)
     n_inconst_forcings = CB.get_n_inconst_forcings(Id)
     assert n_inconst_forcings == 0
+
+
+def test_dominance_matrix_matches_pairwise_comparison(csv_file):
+    CB = CaseBase(pd.read_csv(csv_file))
+    M = CB.get_dominance_matrix()
+    inds = range(len(CB))
+    assert {(i, j) for i in inds for j in inds if M[i, j]} == {
+        (i, j) for i in inds for j in inds if CB[i] <= CB[j]
+    }
+
+
+def test_binary_dimensions(csv_file):
+    df = pd.read_csv(csv_file)
+    df["Refund"] = [0, 1, 0, 1, 1, 0, 0]
+    df["Kind"] = ["a", "b", "a", "b", "b", "a", "a"]
+    CB = CaseBase(df)
+    bits, rest = binary_dimensions(CB.store.ranks, CB.store.tables)
+    assert bits.shape == (7, 1)
+    assert [CB.store.dims[k] for k in rest] == ["Website"]
+    M = CB.get_dominance_matrix()
+    assert (M == [[a <= b for b in CB] for a in CB]).all()
+
+
+def test_forcing_relation(csv_file):
+    CB = CaseBase(pd.read_csv(csv_file))
+    inds = [0, 2, 3, 5, 6]
+    expected = {(i, j) for i in inds for j in inds if CB[i] <= CB[j]}
+    F = CB.get_forcings(inds)
+    assert set(F) == expected
+    CB.get_dominance_matrix()
+    F = CB.get_forcings(inds)
+    assert set(F) == expected
+    assert all((i, j) in F for i, j in expected)
+    assert (F.to_scipy().toarray() == F.transpose().to_scipy().toarray().T).all()
+    Id = CB.determine_inconsistent_forcings(inds, F)
+    legacy = {i: {j for j in inds if (i, j) in Id} for i in inds}
+    assert (
+        Relation.from_sets(legacy, len(CB)).pairs()[1].tolist() == Id.indices.tolist()
+    )
+    assert CB.determine_removals(inds, Id) == CB.determine_removals(inds, legacy)
+
+
+def test_pruned_dominance_blocks():
+    # Rank sums and bounds prune the candidates, also with a partial order.
+    rng = np.random.default_rng(0)
+    ranks = rng.integers(0, 4, (200, 4))
+    tables = [None, None, None, np.array([[1, 1, 0, 0], [0, 1, 0, 0]] * 2, bool)]
+    s = rng.integers(0, 2, 200)
+    expected = np.array(
+        [
+            [
+                all(
+                    (
+                        (a[k] <= b[k] if o == 1 else a[k] >= b[k])
+                        if tables[k] is None
+                        else (
+                            tables[k][a[k], b[k]] if o == 1 else tables[k][b[k], a[k]]
+                        )
+                    )
+                    for k in range(4)
+                )
+                for b in ranks
+            ]
+            for a, o in zip(ranks, s)
+        ]
+    )
+    M = dominance_matrix(ranks, tables, s, block_pairs=1000, verb=False)
+    assert (M == expected).all()
+    same = s[:, None] == s[None, :]
+    n_a, n_d = outcome_counts(ranks, tables, s, block_pairs=1000, verb=False)
+    assert (n_a == (M & same).sum(axis=1)).all()
+    assert (n_d == (M & ~same).sum(axis=1)).all()
+
+
+@pytest.mark.parametrize("make_consistent", [False, True])
+def test_alpha_pruned_inconsistent_forcings(csv_file, make_consistent):
+    CB = CaseBase(pd.read_csv(csv_file), auth_method="relative")
+    inds = range(len(CB))
+    F = CB.get_forcings(inds, make_consistent)
+    expected = set(CB.determine_inconsistent_forcings(inds, F))
+    assert set(CB.get_inconsistent_forcings(inds, make_consistent)) == expected
+    CB.get_dominance_matrix()
+    assert set(CB.get_forcings(inds, make_consistent)) == set(F)
+    assert set(CB.get_inconsistent_forcings(inds, make_consistent)) == expected
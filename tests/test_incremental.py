@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from authoritativeness import relative_authoritativeness
+from case_base import CaseBase
+from precedents import PrecedentStatistics, get_precedent_distribution
+
+
+def test_add_case(csv_file):
+    df = pd.read_csv(csv_file)
+    CB = CaseBase(df.iloc[:4], auth_method="relative")
+    CB.get_dominance_matrix()
+    for name, row in df.iloc[4:].iterrows():
+        CB.add_case(row.to_dict(), row["Label"], name)
+    M = np.array([[a <= b for b in CB] for a in CB])
+    assert (CB.get_dominance_matrix() == M).all()
+    assert list(CB.get_alphas()) == [relative_authoritativeness(c, CB) for c in CB]
+
+
+def test_remove_case(csv_file):
+    CB = CaseBase(pd.read_csv(csv_file), auth_method="absolute")
+    CB.get_dominance_matrix()
+    removed = CB.remove_case(2)
+    assert removed.name == 2 and removed["Website"] == 0
+    assert [c.name for c in CB] == [0, 1, 6, 3, 4, 5]
+    M = np.array([[a <= b for b in CB] for a in CB])
+    assert (CB.get_dominance_matrix() == M).all()
+    assert CB[0].alpha == 5 / 6
+
+
+def test_precedent_statistics(csv_file):
+    df = pd.read_csv(csv_file)
+    CB = CaseBase(df.iloc[:3])
+    stats = PrecedentStatistics(CB)
+    for name, row in df.iloc[3:].iterrows():
+        stats.add(CB, CB.add_case(row.to_dict(), row["Label"], name))
+    assert stats.results(CB) == get_precedent_distribution(CB, n_jobs=1)
+    stats.remove(CB, 0)
+    CB.remove_case(0)
+    assert stats.results(CB) == get_precedent_distribution(CB, n_jobs=1)
+
+
+def test_remove_case_keeps_copies(csv_file):
+    CB = CaseBase(pd.read_csv(csv_file))
+    M = CB.get_dominance_matrix().copy()
+    copy = CB.with_auth_method("relative")
+    CB.remove_case(2)
+    assert (copy.get_dominance_matrix() == M).all()
+    copy.remove_case(0)
+    assert CB.get_dominance_matrix().shape == (6, 6)
+    assert (CB.get_dominance_matrix() == [[a <= b for b in CB] for a in CB]).all()
+
+
+def test_add_case_with_unknown_value(csv_file):
+    df = pd.read_csv(csv_file)
+    df["Kind"] = ["a", "b", "a", "c", "b", "c", "a"]
+    CB = CaseBase(df, auth_method="relative")
+    CB.get_dominance_matrix()
+    values = dict(df.iloc[0], Kind="zz")
+    k = CB.add_case(values, 1, "new")
+    assert CB[k] <= CB[k] and not CB[k] <= CB[0]
+    assert CB.get_dominance_matrix()[k, k]
+    assert not np.isnan(CB[k].alpha)
+    CB.add_case(values, 0, "other")
+    assert CB.get_dominance_matrix()[k, k + 1]
+
+
+def test_unknown_value_after_reencoding(csv_file):
+    df = pd.read_csv(csv_file)
+    df["Kind"] = ["a", "b", "a", "c", "b", "c", "a"]
+    CB = CaseBase(df, auth_method="relative")
+    k = CB.add_case(dict(df.iloc[0], Kind="zz"), 1, "new")
+    CB[1]["Website"] = 2
+    CB.calculate_alphas()
+    assert CB[k] <= CB[k]
+
+    # The same orders, with the unseen value, in a case base built at once.
+    manords = {d: CB.D[d].le for d in CB.D if d != "Kind"}
+    manords["Kind"] = CB.D["Kind"].pairs()
+    fresh = CaseBase(CB.to_frame(), manords=manords, auth_method="relative")
+    assert list(CB.get_alphas()) == list(fresh.get_alphas())
+
+
+def test_add_case_with_replaced_values(csv_file):
+    df = pd.read_csv(csv_file)
+    df["Kind"] = ["a", "b", "a", "c", "b", "c", "a"]
+    df.index = np.arange(10, 17, dtype=np.int64)
+    CB = CaseBase(df.iloc[:6], replace=True)
+    CB.get_dominance_matrix()
+    CB.add_case(df.iloc[5].to_dict(), 0, np.int64(20))
+    k = CB.add_case(df.iloc[6].to_dict(), 1)
+    assert CB[k].name == 21
+    assert CB.to_frame().loc[21, "Kind"] == "a"
+    M = np.array([[a <= b for b in CB] for a in CB])
+    assert (CB.get_dominance_matrix() == M).all()
+    with pytest.raises(ValueError):
+        CB.add_case(dict(df.iloc[6], Kind="zz"), 1)
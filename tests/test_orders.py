@@ -0,0 +1,47 @@
+import pandas as pd
+
+from case_base import CaseBase
+from orders import OrderCache
+
+
+def test_order_cache(csv_file, tmp_path, monkeypatch):
+    df = pd.read_csv(csv_file)
+    df["Kind"] = ["a", "b", "a", "c", "b", "c", "a"]
+    fits = []
+    fit_orders = CaseBase.fit_orders
+    monkeypatch.setattr(
+        CaseBase, "fit_orders", lambda self, df: fits.append(1) or fit_orders(self, df)
+    )
+
+    cache = OrderCache(tmp_path / "orders")
+    expected = CaseBase(df.copy(), auth_method="relative")
+    for auth_method in ["default", "relative", "absolute"]:
+        CB = CaseBase(df.copy(), auth_method=auth_method, order_cache=cache)
+    assert len(fits) == 2 and len(cache) == 1
+    assert (CB.store.ranks == expected.store.ranks).all()
+
+    # The orders are read from disk by a new cache.
+    CB = CaseBase(df.copy(), auth_method="relative", order_cache=OrderCache(cache.path))
+    assert len(fits) == 2
+    assert (CB.get_alphas() == expected.get_alphas()).all()
+
+    # Other parameters or data are stored under other keys.
+    CaseBase(df.copy(), replace=True, order_cache=cache)
+    CaseBase(df.iloc[1:].copy(), order_cache=cache)
+    assert len(fits) == 4 and len(cache) == 3
+    cache.invalidate(cache.keys()[0])
+    assert len(cache) == 2
+    cache.invalidate()
+    assert len(cache) == 0 and not list((tmp_path / "orders").iterdir())
+
+
+def test_replace_keeps_input(csv_file):
+    df = pd.read_csv(csv_file)
+    df["Kind"] = ["a", "b", "a", "c", "b", "c", "a"]
+    given = df.copy()
+    CB = CaseBase(df, replace=True)
+    assert df.equals(given)
+    assert list(CB.D) == list(CaseBase(df).D)
+    assert CB.replaced["Kind"] == ["c", "b", "a"]
+    assert CB.df["Kind"].tolist() == [2, 1, 2, 0, 1, 0, 2]
+    assert CB.df["Website"].tolist() == df["Website"].tolist()
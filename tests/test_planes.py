@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from case_base import CaseBase
+from experiments.authoritativeness import evaluate_case_base, evaluate_orders
+
+
+@pytest.mark.parametrize("flips, drop", [((), ()), (("Website",), ()), ((), ("Gift",))])
+def test_with_orders(csv_file, tmp_path, flips, drop):
+    df = pd.read_csv(csv_file)
+    CB = CaseBase(df, auth_method="relative")
+    flipped = CB.with_orders(flips, drop)
+    manords = {
+        d: (CB.D[d].reversed() if d in flips else CB.D[d]).le
+        for d in CB.D
+        if d not in drop
+    }
+    expected = CaseBase(
+        df.drop(columns=list(drop)), auth_method="relative", manords=manords
+    )
+    inds = range(len(CB))
+    assert (
+        flipped.get_dominance_bits().to_dense() == expected.get_dominance_matrix()
+    ).all()
+    assert np.array_equal(flipped.get_alphas(), expected.get_alphas(), equal_nan=True)
+    assert set(flipped.get_inconsistent_forcings(inds)) == set(
+        expected.get_inconsistent_forcings(inds)
+    )
+    on_disk = CB.with_orders(flips, drop, path=tmp_path / "dominance.npy")
+    assert (
+        on_disk.get_dominance_bits().words == flipped.get_dominance_bits().words
+    ).all()
+    assert on_disk.store.dims == list(expected.D)
+
+
+def test_reversed_dimension(csv_file):
+    CB = CaseBase(pd.read_csv(csv_file))
+    for d in CB.D:
+        dim = CB.D[d].reversed()
+        values = pd.read_csv(csv_file)[d]
+        for x in values:
+            for y in values:
+                assert dim.le(x, y) == CB.D[d].le(y, x)
+
+
+@pytest.mark.parametrize("make_consistent", [False, True])
+def test_evaluate_orders(csv_file, make_consistent):
+    df = pd.read_csv(csv_file)
+    CB = CaseBase(df, auth_method="relative")
+    variants = [(("Website",), ()), ((), ("Gift",))]
+    results = dict(evaluate_orders(CB, variants, make_consistent))
+    for flips, drop in variants:
+        manords = {
+            d: (CB.D[d].reversed() if d in flips else CB.D[d]).le
+            for d in CB.D
+            if d not in drop
+        }
+        expected = CaseBase(
+            df.drop(columns=list(drop)), auth_method="relative", manords=manords
+        )
+        assert results[flips, drop] == evaluate_case_base(
+            expected, make_consistent, precedents={}
+        )
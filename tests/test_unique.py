@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from case_base import CaseBase
+from experiments.authoritativeness import evaluate_case_base
+from precedents import get_precedent_distribution
+
+
+@pytest.mark.parametrize("auth_method", ["default", "relative", "harmonic_1.0"])
+def test_unique_cases(csv_file, auth_method):
+    df = pd.read_csv(csv_file)
+    df = pd.concat([df, df.iloc[[0, 3, 5]].assign(Label=[0, 0, 1])], ignore_index=True)
+    CB = CaseBase(df.copy(), auth_method=auth_method)
+    unique = CaseBase(df.copy(), auth_method=auth_method, dedup=True)
+    assert len(unique.get_unique()) == 3
+    assert np.array_equal(unique.get_alphas(), CB.get_alphas(), equal_nan=True)
+    expected = get_precedent_distribution(CB, n_jobs=1)
+    assert get_precedent_distribution(unique) == expected
+    for removal_method in ["greedy", "exact"]:
+        expected = evaluate_case_base(CB, removal_method=removal_method)
+        assert evaluate_case_base(unique, removal_method=removal_method) == expected
+
+
+def test_unique_removals(csv_file):
+    df = pd.read_csv(csv_file)
+    df["Label"] = [1, 0, 1, 0, 1, 0, 1]
+    CB = CaseBase(df, dedup=True)
+    inds = range(len(CB))
+    Id = CB.determine_inconsistent_forcings(inds, CB.get_forcings(inds))
+    assert CB.count_inconsistent_forcings() == CB.get_n_inconst_forcings(Id)
+    assert CB.unique_removals("greedy") == CB.determine_removals(inds, Id)
+    assert len(CB.unique_removals("exact")) == 3
+    assert np.array_equal(CB.get_unique().w, [[1, 2, 0], [2, 1, 1]])
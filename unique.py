@@ -0,0 +1,153 @@
+# A deduplicated representation of a case base. Cases with identical values
+# in every dimension are collapsed into one unique fact situation, which
+# carries the number of cases with each outcome in it. Since the relation
+# between cases only depends on their values and outcome, all pairwise work
+# can be done on the unique fact situations and weighted by these numbers.
+import numpy as np
+
+from consistency import weighted_cover
+from dominance import dominance_matrix
+from relation import Relation
+
+
+class UniqueCases:
+    """
+    The unique fact situations of a CaseStore.
+
+    Attributes.
+        ranks: The rank matrix of the unique fact situations.
+        tables: The relation tables of the dimensions (see dominance.py).
+        inverse: The index of the unique fact situation of every case.
+        outcome: For every case 1 if its outcome is 1 and 0 otherwise.
+        w: A matrix holding in w[o, u] the number of cases with unique fact
+            situation u and outcome o.
+        first: A matrix holding in first[o, u] the index of the first case
+            with unique fact situation u and outcome o, or -1.
+    """
+
+    def __init__(self, store):
+        self.ranks, inverse = np.unique(store.ranks, axis=0, return_inverse=True)
+        self.tables = store.tables
+        self.inverse = inverse.reshape(-1)
+        self.outcome = (store.outcomes == 1).astype(np.int64)
+        self.w = np.zeros((2, len(self.ranks)), dtype=np.int64)
+        np.add.at(self.w, (self.outcome, self.inverse), 1)
+        self.first = np.full((2, len(self.ranks)), -1, dtype=np.int64)
+        rows = np.arange(len(self.inverse))[::-1]
+        self.first[self.outcome[rows], self.inverse[rows]] = rows
+        self._dominance = None
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def get_dominance_matrix(self):
+        """
+        Return the boolean matrix U where U[u, v] holds iff the values of u
+        are <= those of v in the direction of the plaintiff. For outcome 0 the
+        relation is the transpose, as the direction is reversed.
+        """
+        if self._dominance is None:
+            self._dominance = dominance_matrix(
+                self.ranks, self.tables, np.ones(len(self), dtype=np.int64), verb=False
+            )
+        return self._dominance
+
+    def expand(self, values):
+        """Expand values given per outcome and unique fact situation to cases."""
+        return values[self.outcome, self.inverse]
+
+    def per_unique(self, values):
+        """Return the values of cases at the first case of every group."""
+        values = np.asarray(values)
+        result = np.full(self.first.shape, np.nan)
+        known = self.first >= 0
+        result[known] = values[self.first[known]]
+        return result
+
+    def agreement_counts(self):
+        """Return the agreement and disagreement counts of every case."""
+        U = self.get_dominance_matrix().astype(np.int64)
+        w0, w1 = self.w
+        n_a = np.array([U.T @ w0, U @ w1])
+        n_d = np.array([U.T @ w1, U @ w0])
+        return self.expand(n_a), self.expand(n_d)
+
+    def conflicts(self, alphas=None):
+        """
+        Return the pairs (u, v) of unique fact situations such that the
+        cases with outcome 1 in u and the cases with outcome 0 in v form
+        inconsistent forcings. If alphas are given, only pairs of cases with
+        the same alpha are inconsistent (see CaseBase.get_forcings and
+        CaseBase.determine_inconsistent_forcings).
+        """
+        C = self.get_dominance_matrix() & (self.w[1] > 0)[:, None] & (self.w[0] > 0)
+        if alphas is not None:
+            a = self.per_unique(alphas)
+            C &= a[1][:, None] == a[0][None, :]
+        return np.nonzero(C)
+
+    def n_inconsistent_forcings(self, alphas=None):
+        """
+        Return the number of inconsistent forcings, counted as in
+        CaseBase.get_n_inconst_forcings, i.e. twice the number of pairs.
+        """
+        I, J = self.conflicts(alphas)
+        return 2 * int((self.w[1, I] * self.w[0, J]).sum())
+
+    def removals(self, weights, alphas=None, n_jobs=1):
+        """
+        Determine a set of cases of minimum total weight whose removal
+        resolves all conflicts. As cases in the same group conflict with the
+        same cases, some minimum cover consists of whole groups, so the cover
+        is computed on the groups with their total weights as weights.
+        """
+        I, J = self.conflicts(alphas)
+        n = len(self)
+        group_weights = np.zeros((2, n))
+        np.add.at(group_weights, (self.outcome, self.inverse), weights)
+        s = np.repeat([0, 1], n)
+        removed, _ = weighted_cover(
+            I + n, J, s, group_weights.reshape(-1), n_jobs=n_jobs
+        )
+        removed_groups = np.zeros(2 * n, dtype=bool)
+        removed_groups[removed] = True
+        return np.flatnonzero(removed_groups[self.outcome * n + self.inverse]).tolist()
+
+    def greedy_removals(self, alphas=None):
+        """
+        Determine the cases that CaseBase.determine_removals removes with the
+        'greedy' method, i.e. repeatedly the first case with the most
+        inconsistent forcings. All remaining cases of a group have the same
+        number of inconsistent forcings, so only the groups are compared.
+        """
+        I, J = self.conflicts(alphas)
+        n = len(self)
+        # The conflicts between the groups, where group o * n + u holds the
+        # cases with unique fact situation u and outcome o.
+        A = Relation.from_pairs(
+            2 * n, np.concatenate([I + n, J]), np.concatenate([J, I + n])
+        )
+        remaining = self.w.reshape(-1).copy()
+        rows, cols = A.pairs()
+        degree = np.zeros(2 * n, dtype=np.int64)
+        np.add.at(degree, rows, remaining[cols])
+
+        # The cases of every group in order of their index.
+        group = self.outcome * n + self.inverse
+        order = np.argsort(group, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(remaining)])
+        taken = np.zeros(2 * n, dtype=np.int64)
+
+        removed = []
+        while True:
+            active = np.flatnonzero(remaining > 0)
+            if len(active) == 0 or degree[active].max() == 0:
+                break
+            candidates = active[degree[active] == degree[active].max()]
+            firsts = order[starts[candidates] + taken[candidates]]
+            g = candidates[np.argmin(firsts)]
+            removed.append(int(firsts.min()))
+            taken[g] += 1
+            remaining[g] -= 1
+            degree[A[g]] -= 1
+        return removed